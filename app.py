@@ -2,20 +2,25 @@
 NER Demo FastAPI服务
 提供RESTful API接口，支持前端传入文本和模型选择进行实体抽取
 """
-import sys
 import os
+import atexit
+import queue
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
-# 添加项目根目录到Python路径
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
-os.chdir(project_root)
+# 项目根目录（所有资源路径都基于此目录计算绝对路径，不依赖当前工作目录）
+project_root = Path(__file__).resolve().parent
 
 # 加载环境变量文件（优先加载 .env，如果不存在则尝试 dev.env）
 env_file = project_root / '.env'
@@ -28,8 +33,10 @@ else:
     print("⚠ 未找到 .env 或 dev.env 文件，将使用系统环境变量")
 
 from src.model_manager import ModelManager
+from src.models import QwenFlashModel
 from src.processors import FileReader
 from src.config import ConfigManager
+from src.config.constants import SUPPORTED_MODELS
 from src.database import DatabaseConnection
 from src.api.dependencies import init_dependencies
 from src.api.routes import system, extract, file
@@ -42,23 +49,110 @@ log_dir.mkdir(exist_ok=True)
 log_file = log_dir / f"inference_{datetime.now().strftime('%Y%m%d')}.log"
 
 # 配置日志格式和处理器
+# 请求线程只把日志记录放入队列，由后台线程写入文件和控制台，
+# 避免每条日志都在请求路径上执行 write/flush
+log_formatter = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+file_handler = logging.FileHandler(log_file, encoding='utf-8')
+file_handler.setFormatter(log_formatter)
+console_handler = logging.StreamHandler()  # 同时输出到控制台
+console_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+
+
+def _stop_logging():
+    """停止日志后台线程（写完队列中剩余的日志）并关闭日志文件"""
+    log_listener.stop()
+    file_handler.close()
+
+
+atexit.register(_stop_logging)
+
+# src.config.env_loader 在导入时已调用过 basicConfig，这里使用 force=True 替换根日志处理器
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()  # 同时输出到控制台
-    ]
+    handlers=[QueueHandler(log_queue)],
+    force=True
 )
 
 logger = logging.getLogger("NER_API")
 
-# 创建FastAPI应用
+# 启动时预加载的模型（逗号分隔，设置为空字符串可跳过预加载，适用于开发环境）
+PRELOAD_MODELS = os.getenv('PRELOAD_MODELS', 'qwen-flash,nlp_structbert_siamese-uie_chinese-base')
+
+# 线程池大小（模型推理、数据库查询等阻塞操作都在线程池中执行）
+THREADPOOL_SIZE = int(os.getenv('THREADPOOL_SIZE', '40'))
+
+
+def _init_database():
+    """创建并测试MySQL数据库连接，失败时返回None"""
+    try:
+        db_connection = DatabaseConnection()
+        if db_connection.test_connection():
+            logger.info("MySQL数据库连接成功 - Host: %s, Database: %s", db_connection.host, db_connection.database)
+        else:
+            logger.warning("MySQL数据库连接测试失败")
+        return db_connection
+    except Exception as e:
+        logger.error("MySQL数据库连接初始化失败: %s", e)
+        return None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期管理
+
+    启动时初始化模型管理器、配置和数据库连接，并预加载模型，
+    避免在导入阶段执行耗时操作，同时消除首个请求的模型加载延迟。
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    model_manager = ModelManager(base_path=str(project_root))
+    file_reader = FileReader()
+    config_manager = ConfigManager()
+
+    # 测试MySQL数据库连接（阻塞操作，放到线程池中执行）
+    db_connection = await run_in_threadpool(_init_database)
+
+    # 初始化依赖项（传入已测试的数据库连接）
+    init_dependencies(model_manager, file_reader, config_manager, project_root, db_connection)
+
+    # 预加载模型
+    for model_name in [name.strip() for name in PRELOAD_MODELS.split(',') if name.strip()]:
+        try:
+            await run_in_threadpool(model_manager.load_model, model_name)
+            logger.info("模型预加载成功: %s", model_name)
+        except Exception as e:
+            logger.warning("模型预加载失败，将在首次请求时加载: %s, 错误: %s", model_name, e)
+
+    app.state.model_manager = model_manager
+    app.state.file_reader = file_reader
+    app.state.config_manager = config_manager
+    app.state.db_connection = db_connection
+
+    yield
+
+    # 关闭时释放推理线程池、模型和数据库连接池
+    extract.inference_executor.shutdown(wait=False, cancel_futures=True)
+    QwenFlashModel.shutdown_remote_executor()
+    model_manager.unload_all()
+    if db_connection:
+        db_connection.close()
+
+
+# 创建FastAPI应用（默认使用orjson序列化响应）
 app = FastAPI(
     title="NER Demo API",
     description="基于ModelScope的中文命名实体识别（NER）API服务",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # 配置CORS
@@ -70,28 +164,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 初始化模型管理器和文件读取器
-model_manager = ModelManager(base_path=str(project_root))
-file_reader = FileReader()
-config_manager = ConfigManager()
-
-# 测试MySQL数据库连接
-db_connection = None
-db_status = "未配置"
-try:
-    db_connection = DatabaseConnection()
-    if db_connection.test_connection():
-        db_status = "✓ 连接成功"
-        logger.info(f"MySQL数据库连接成功 - Host: {db_connection.host}, Database: {db_connection.database}")
-    else:
-        db_status = "✗ 连接失败"
-        logger.warning("MySQL数据库连接测试失败")
-except Exception as e:
-    db_status = f"✗ 连接失败: {str(e)}"
-    logger.error(f"MySQL数据库连接初始化失败: {str(e)}")
-
-# 初始化依赖项（传入已测试的数据库连接）
-init_dependencies(model_manager, file_reader, config_manager, project_root, db_connection)
+class StreamAwareGZipMiddleware:
+    """
+    压缩较大的响应，但跳过流式接口
+
+    GZipMiddleware 不会为每个数据块刷新压缩器，客户端声明支持gzip时，
+    NDJSON流式接口的结果会被攒成大块甚至到最后才一次性发出，失去逐行返回的意义
+    """
+
+    # 不压缩的流式接口路径
+    STREAMING_PATHS = frozenset({"/api/batch/extract/stream"})
+
+    def __init__(self, app, minimum_size: int = 500):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.STREAMING_PATHS:
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+
+# 压缩较大的响应（如批量抽取结果），小于1KB的响应不压缩
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024)
+
 
 # 注册路由
 app.include_router(system.router)
@@ -105,14 +202,10 @@ if __name__ == "__main__":
     print("NER Demo API服务启动 (FastAPI)")
     print("=" * 60)
     
-    # 显示MySQL数据库连接状态
-    print(f"MySQL数据库: {db_status}")
-    if db_connection:
-        print(f"  主机: {db_connection.host}:{db_connection.port}")
-        print(f"  数据库: {db_connection.database}")
-        print(f"  用户: {db_connection.user}")
-    
-    print(f"支持的模型: {', '.join(model_manager.list_models())}")
+    # 显示MySQL数据库配置（连接测试在服务启动时进行，结果见日志）
+    print(f"MySQL数据库: {os.getenv('MYSQL_HOST', 'localhost')}:{os.getenv('MYSQL_PORT', '3306')}/{os.getenv('MYSQL_DATABASE', '')}")
+    print(f"支持的模型: {', '.join(SUPPORTED_MODELS)}")
+    print(f"预加载模型: {PRELOAD_MODELS or '无'}")
     api_key = os.getenv('DASHSCOPE_API_KEY')
     qwen_status = '已启用' if (api_key and api_key.strip() and api_key != 'your_api_key_here') else '未配置（需要DASHSCOPE_API_KEY）'
     print(f"Qwen-Flash模型: {qwen_status}")
@@ -122,4 +215,13 @@ if __name__ == "__main__":
     
     # 启动FastAPI服务
     # 默认运行在 http://localhost:8000
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # 生产模式按CPU核数启动多个worker；设置 DEV=1 时使用单进程热重载（开发模式）
+    # uvicorn[standard] 已包含 uvloop/httptools，loop/http 保持 auto 即可自动选用（Windows下回退到asyncio）
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv('WEB_CONCURRENCY', '1')),
+        reload=os.getenv('DEV') == '1',
+        access_log=False
+    )
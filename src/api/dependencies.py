@@ -2,20 +2,32 @@
 API 依赖项
 用于依赖注入
 """
+import os
 from fastapi import Depends
 from src.model_manager import ModelManager
 from src.processors import FileReader, AddressCompleter
 from src.config import ConfigManager
 from src.database import DatabaseConnection
+from src.utils.lru_cache import LRUCache
 from pathlib import Path
 
-# 这些将在 app.py 中初始化
+# 推理结果缓存条目数和过期时间（每个worker进程独立缓存，条目数设置为0可关闭缓存）
+INFERENCE_CACHE_SIZE = int(os.getenv('NER_CACHE_SIZE', '1024'))
+INFERENCE_CACHE_TTL = float(os.getenv('NER_CACHE_TTL', '3600'))
+# 单条抽取接口的完整响应缓存（包含格式转换和地址补全的结果）
+RESPONSE_CACHE_SIZE = int(os.getenv('NER_RESPONSE_CACHE_SIZE', '4096'))
+RESPONSE_CACHE_TTL = float(os.getenv('NER_RESPONSE_CACHE_TTL', '300'))
+
+# 这些将在 app.py 中初始化；下面的获取函数定义为 async def，
+# FastAPI 直接在事件循环中调用，不会为每个依赖项切换到线程池执行
 _model_manager: ModelManager = None
 _file_reader: FileReader = None
 _config_manager: ConfigManager = None
 _db_connection: DatabaseConnection = None
 _address_completer: AddressCompleter = None
 _project_root: Path = None
+_inference_cache: LRUCache = LRUCache(maxsize=INFERENCE_CACHE_SIZE, ttl=INFERENCE_CACHE_TTL)
+_response_cache: LRUCache = LRUCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
 
 
 def init_dependencies(model_manager: ModelManager, file_reader: FileReader, 
@@ -45,37 +57,46 @@ def init_dependencies(model_manager: ModelManager, file_reader: FileReader,
     except Exception as e:
         import logging
         logger = logging.getLogger("NER_API")
-        logger.warning(f"数据库连接初始化失败，地址补全功能将不可用: {str(e)}")
+        logger.warning("数据库连接初始化失败，地址补全功能将不可用: %s", e)
         _db_connection = None
         _address_completer = None
 
 
-def get_model_manager() -> ModelManager:
+async def get_model_manager() -> ModelManager:
     """获取模型管理器"""
     return _model_manager
 
 
-def get_file_reader() -> FileReader:
+async def get_file_reader() -> FileReader:
     """获取文件读取器"""
     return _file_reader
 
 
-def get_config_manager() -> ConfigManager:
+async def get_config_manager() -> ConfigManager:
     """获取配置管理器"""
     return _config_manager
 
 
-def get_project_root() -> Path:
+async def get_project_root() -> Path:
     """获取项目根目录"""
     return _project_root
 
 
-def get_db_connection() -> DatabaseConnection:
+async def get_db_connection() -> DatabaseConnection:
     """获取数据库连接"""
     return _db_connection
 
 
-def get_address_completer() -> AddressCompleter:
+async def get_address_completer() -> AddressCompleter:
     """获取地址补全器"""
     return _address_completer
 
+
+async def get_inference_cache() -> LRUCache:
+    """获取推理结果缓存"""
+    return _inference_cache
+
+
+async def get_response_cache() -> LRUCache:
+    """获取单条抽取接口的完整响应缓存"""
+    return _response_cache
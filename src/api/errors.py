@@ -0,0 +1,37 @@
+"""
+路由异常处理
+路由中未捕获的异常统一记录堆栈并转换为500错误
+"""
+import logging
+from typing import Callable
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+
+logger = logging.getLogger("NER_API")
+
+
+class ErrorLoggingRoute(APIRoute):
+    """
+    未捕获的异常记录堆栈后转换为500的HTTPException
+
+    HTTPException 在路由内部的异常处理中间件中转换为响应，响应仍经过CORS中间件，带有CORS头；
+    而 app.exception_handler(Exception) 注册在最外层，返回的500响应没有CORS头，
+    处理后Starlette还会再次抛出异常，堆栈被记录两次
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request):
+            try:
+                return await handler(request)
+            except (HTTPException, RequestValidationError):
+                raise
+            except Exception as e:
+                logger.exception("未处理的异常 - %s %s: %s", request.method, request.url.path, e)
+                raise HTTPException(status_code=500, detail=f"服务器内部错误: {str(e)}")
+
+        return route_handler
@@ -1,23 +1,110 @@
 """
 实体抽取相关路由
 """
+import os
 import time
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from functools import partial
+from typing import Optional
+import orjson
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from src.api.schemas import ExtractRequest, ExtractResponse, BatchExtractRequest, BatchExtractResponse
 from src.processors.converters import convert_mgeo_to_qwen_flash_format, convert_mgeo_tagging_to_qwen_flash_format, convert_ner_to_address_format
-from src.api.dependencies import get_model_manager, get_file_reader, get_config_manager, get_address_completer
+from src.api.dependencies import get_model_manager, get_file_reader, get_config_manager, get_address_completer, get_inference_cache, get_response_cache
+from src.api.errors import ErrorLoggingRoute
+from src.config.constants import SUPPORTED_MODEL_NAMES, SUPPORTED_MODELS_DETAIL
+from src.models.pipeline_batch import DEFAULT_BATCH_SIZE
+from src.utils.lru_cache import make_inference_cache_key
+from src.utils.micro_batcher import MicroBatcher
+from src.utils.timestamp import now_iso
 
-router = APIRouter()
+router = APIRouter(route_class=ErrorLoggingRoute)
 logger = logging.getLogger("NER_API")
 
+# 同时进行的模型推理数量上限，避免并发请求争抢CPU/GPU
+INFERENCE_CONCURRENCY = int(os.getenv('NER_INFER_CONCURRENCY', '2'))
+inference_semaphore = asyncio.Semaphore(INFERENCE_CONCURRENCY)
+# 模型推理专用线程池，不占用默认线程池（地址补全、文件读取等仍使用默认线程池），应用关闭时释放
+inference_executor = ThreadPoolExecutor(max_workers=INFERENCE_CONCURRENCY, thread_name_prefix="ner-inference")
 
-@router.post("/api/extract", response_model=ExtractResponse, tags=["实体抽取"])
+
+async def run_inference(func, *args):
+    """
+    在推理专用线程池中执行阻塞的模型推理，不阻塞事件循环
+
+    先获取信号量再提交任务：排队期间被取消的请求（如客户端断开）不会再占用推理线程
+    """
+    async with inference_semaphore:
+        return await asyncio.get_running_loop().run_in_executor(inference_executor, func, *args)
+
+
+async def run_single_inference(model, content: str, schema):
+    """
+    单条文本推理：提供异步接口的远程模型（qwen-flash）在其自己的线程池中调用，
+    等待网络时不占用本地模型的推理线程和推理信号量
+    """
+    aextract = getattr(model, 'aextract_entities', None)
+    if aextract is not None:
+        return await aextract(content, schema)
+    return await run_inference(model.extract_entities, content, schema)
+
+
+# 单条抽取请求的微批处理：等待窗口内相同模型和schema的请求合并为一次批量推理
+# （NER_MICRO_BATCH_SIZE 设置为1可关闭合并）
+MICRO_BATCH_SIZE = int(os.getenv('NER_MICRO_BATCH_SIZE', '16'))
+MICRO_BATCH_WAIT_MS = float(os.getenv('NER_MICRO_BATCH_WAIT_MS', '10'))
+micro_batcher = MicroBatcher(run_inference, max_batch_size=MICRO_BATCH_SIZE, max_wait=MICRO_BATCH_WAIT_MS / 1000)
+
+
+async def load_requested_model(model_manager, model_name: str):
+    """
+    校验请求的模型名称并加载模型（加载在线程池中执行）
+    
+    Raises:
+        HTTPException: 模型不受支持时返回400，加载失败时返回500
+    """
+    if model_name not in SUPPORTED_MODEL_NAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不支持的模型: {model_name}。{SUPPORTED_MODELS_DETAIL}"
+        )
+    try:
+        return await run_in_threadpool(model_manager.load_model, model_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"模型加载失败: {str(e)}")
+
+
+# mgeo模型的结果需要转换为qwen-flash格式：模型名称 -> 转换函数
+_MGEO_CONVERTERS = {
+    'mgeo_geographic_composition_analysis_chinese_base': convert_mgeo_to_qwen_flash_format,
+    'mgeo_geographic_elements_tagging_chinese_base': convert_mgeo_tagging_to_qwen_flash_format,
+}
+
+
+# 正在处理的单条抽取请求：缓存键 -> 处理任务（只在事件循环线程中访问，无需加锁）
+_inflight_responses = {}
+
+
+def _is_cacheable(result) -> bool:
+    """推理失败的结果（含error字段或Success为False）不写入缓存，下次请求重新推理"""
+    return isinstance(result, dict) and "error" not in result and result.get("Success") is not False
+
+
+# 直接返回字典，由ORJSONResponse序列化，不再经过response_model二次校验；
+# responses 参数仅用于生成接口文档
+@router.post("/api/extract", responses={200: {"model": ExtractResponse}}, tags=["实体抽取"])
 async def extract_entities(
     request: ExtractRequest,
     model_manager=Depends(get_model_manager),
     config_manager=Depends(get_config_manager),
-    address_completer=Depends(get_address_completer)
+    address_completer=Depends(get_address_completer),
+    inference_cache=Depends(get_inference_cache),
+    response_cache=Depends(get_response_cache)
 ):
     """
     实体抽取接口
@@ -47,101 +134,190 @@ async def extract_entities(
         "ResultCode": "100"
     }
     """
+    content = request.Content
+    # 验证输入
+    if not content or not content.strip():
+        raise HTTPException(status_code=400, detail="Content字段不能为空")
+    
+    # 相同(模型, 文本, schema)的请求复用缓存结果：先查完整响应缓存，再查推理结果缓存
+    cache_key = make_inference_cache_key(request.model, content, request.schema)
+    if cache_key is None:
+        # schema无法生成缓存键时不使用缓存，也不与其他请求合并
+        return await _extract_and_format(
+            request, None, None, model_manager, config_manager,
+            address_completer, inference_cache, response_cache
+        )
+    # 完整响应依赖实体配置中的output_schema，缓存键带上配置版本，配置文件修改后旧的响应不再命中
+    response_key = cache_key + (config_manager.get_config_version(),)
+    response = response_cache.get(response_key)
+    if response is not None:
+        return response
+    
+    # 相同的请求正在处理时等待它的结果，不重复推理；
+    # 用shield包装，某个客户端断开时不会取消其他请求也在等待的任务
+    task = _inflight_responses.get(response_key)
+    if task is None:
+        task = asyncio.ensure_future(_extract_and_format(
+            request, cache_key, response_key, model_manager, config_manager,
+            address_completer, inference_cache, response_cache
+        ))
+        _inflight_responses[response_key] = task
+        task.add_done_callback(partial(_forget_inflight, response_key))
+    return await asyncio.shield(task)
+
+
+def _forget_inflight(cache_key: tuple, task: asyncio.Future):
+    """处理完成后移除正在处理的请求记录，并取出异常，避免无人等待时asyncio报告异常未被获取"""
+    if _inflight_responses.get(cache_key) is task:
+        del _inflight_responses[cache_key]
+    if not task.cancelled():
+        task.exception()
+
+
+async def _extract_and_format(request: ExtractRequest, cache_key: Optional[tuple], response_key: Optional[tuple],
+                              model_manager, config_manager, address_completer, inference_cache, response_cache):
+    """
+    执行推理、格式转换和地址补全，成功的结果写入完整响应缓存
+
+    cache_key 为推理结果缓存键，response_key 为完整响应缓存键，为None时不读写对应的缓存
+    """
+    content, model_name, schema = request.Content, request.model, request.schema
+    result = inference_cache.get(cache_key) if cache_key is not None else None
+    
+    if result is None:
+        # 验证模型名称并加载模型
+        model = await load_requested_model(model_manager, model_name)
+    
+    # 执行实体抽取
+    # 记录推理开始时间（单调时钟，不受系统时间调整影响；整数纳秒计时，相减时不产生浮点误差）
+    inference_start_ns = time.perf_counter_ns()
     try:
-        # 验证输入
-        if not request.Content or not request.Content.strip():
-            raise HTTPException(status_code=400, detail="Content字段不能为空")
+        if result is None:
+            # 支持批量推理的本地模型合并并发请求；对于qwen-flash模型，schema参数会被忽略
+            if MICRO_BATCH_SIZE > 1 and cache_key is not None and hasattr(model, 'extract_entities_batch'):
+                result = await micro_batcher.submit(
+                    (model_name, cache_key[2]), model, content, schema
+                )
+            else:
+                result = await run_single_inference(model, content, schema)
+            if cache_key is not None and _is_cacheable(result):
+                inference_cache.set(cache_key, result)
+            
+            # 记录推理时间到日志（INFO关闭时不计算耗时）
+            if logger.isEnabledFor(logging.INFO):
+                inference_duration = (time.perf_counter_ns() - inference_start_ns) / 1e9
+                logger.info(
+                    "推理时间记录 - 方法: extract_entities | 模型: %s | 文本长度: %d | "
+                    "推理耗时: %.4f秒 (%.2f毫秒) | 状态: 成功",
+                    model_name, len(content), inference_duration, inference_duration * 1000
+                )
         
-        # 验证模型名称
-        if request.model not in model_manager.SUPPORTED_MODELS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"不支持的模型: {request.model}。支持的模型: {list(model_manager.SUPPORTED_MODELS.keys())}"
-            )
+        # qwen-flash模型直接返回统一格式，mgeo模型按模型名称选择转换函数
+        converter = _MGEO_CONVERTERS.get(model_name)
+        if converter is not None:
+            formatted_result = converter(result, content)
+        elif model_name == 'qwen-flash':
+            formatted_result = result
+        else:
+            # macbert和siameseUIE模型需要转换为统一格式
+            # 加载output_schema配置（实体配置首次读取后缓存，不会每次请求都解析文件）
+            output_schema = None
+            try:
+                output_schema = config_manager.get_output_schema()
+            except Exception as e:
+                logger.warning("无法加载output_schema配置: %s，将使用默认映射", e)
+            
+            # 转换为统一格式
+            formatted_result = convert_ner_to_address_format(result, content, output_schema)
         
-        # 加载模型
-        try:
-            model = model_manager.load_model(request.model)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"模型加载失败: {str(e)}")
+        # 进行地址补全
+        # 转换得到的结果是新建的，可以原地补全；qwen-flash的结果可能同时保存在推理缓存中，需要复制后再补全
+        completed = True
+        if address_completer:
+            try:
+                formatted_result = await run_in_threadpool(
+                    address_completer.complete_extract_response, formatted_result,
+                    inplace=formatted_result is not result
+                )
+            except Exception as e:
+                completed = False
+                logger.warning("地址补全失败，返回原始结果: %s", e)
         
-        # 执行实体抽取
-        # 记录推理开始时间
-        inference_start_time = time.time()
+        # 地址补全失败的结果不缓存，下次请求重新补全
+        if completed and response_key is not None and _is_cacheable(formatted_result):
+            response_cache.set(response_key, formatted_result)
+        return formatted_result
+        
+    except Exception as e:
+        # 记录推理结束时间并计算耗时（即使失败也记录）
+        inference_duration = (time.perf_counter_ns() - inference_start_ns) / 1e9
+        
+        # 记录推理时间到日志（失败情况）
+        logger.error(
+            "推理时间记录 - 方法: extract_entities | 模型: %s | 文本长度: %d | "
+            "推理耗时: %.4f秒 (%.2f毫秒) | 状态: 失败 | 错误: %s",
+            model_name, len(content), inference_duration, inference_duration * 1000, e
+        )
+        raise HTTPException(status_code=500, detail=f"实体抽取失败: {str(e)}")
+
+
+def _prepare_batch_request(request: BatchExtractRequest, config_manager):
+    """
+    从批量请求中获取文件名列表、文件内容列表和schema（schema为空时使用entity_config.json）
+    
+    文件名和内容按位置一一对应，分块推理时直接切片，无需反复在字典和列表之间转换；
+    文件名重复时保留最后一个文件的内容
+    
+    Returns:
+        (文件名列表, 文件内容列表, schema)
+    """
+    # 直接提供文件内容列表
+    if not request.files:
+        raise HTTPException(
+            status_code=400,
+            detail="请提供files字段（文件内容列表）"
+        )
+    files_content = {file_item.filename: file_item.content for file_item in request.files}
+    
+    if not files_content:
+        raise HTTPException(status_code=400, detail="没有有效的文件内容需要处理")
+    
+    # 获取schema（可选，默认使用entity_config.json）
+    schema = request.schema
+    if not schema:
         try:
-            # 对于qwen-flash模型，schema参数会被忽略
-            result = model.extract_entities(request.Content, request.schema)
-            
-            # 记录推理结束时间并计算耗时
-            inference_end_time = time.time()
-            inference_duration = inference_end_time - inference_start_time
-            
-            # 记录推理时间到日志
-            logger.info(
-                f"推理时间记录 - 方法: extract_entities | "
-                f"模型: {request.model} | "
-                f"文本长度: {len(request.Content)} | "
-                f"推理耗时: {inference_duration:.4f}秒 ({inference_duration*1000:.2f}毫秒) | "
-                f"状态: 成功"
-            )
-            
-            # qwen-flash模型直接返回统一格式
-            if request.model == 'qwen-flash':
-                formatted_result = result
-            elif request.model == 'mgeo_geographic_composition_analysis_chinese_base':
-                # mgeo地理组成分析模型需要转换为qwen-flash格式
-                formatted_result = convert_mgeo_to_qwen_flash_format(result, request.Content)
-            elif request.model == 'mgeo_geographic_elements_tagging_chinese_base':
-                # mgeo地理要素标注模型需要转换为qwen-flash格式
-                formatted_result = convert_mgeo_tagging_to_qwen_flash_format(result, request.Content)
-            else:
-                # macbert和siameseUIE模型需要转换为统一格式
-                # 加载output_schema配置
-                output_schema = None
-                try:
-                    entity_config = config_manager.load_entity_config()
-                    if isinstance(entity_config, dict) and "output_schema" in entity_config:
-                        output_schema = entity_config["output_schema"]
-                except Exception as e:
-                    logger.warning(f"无法加载output_schema配置: {str(e)}，将使用默认映射")
-                
-                # 转换为统一格式
-                formatted_result = convert_ner_to_address_format(result, request.Content, output_schema)
-            
-            # 进行地址补全
-            if address_completer:
-                try:
-                    formatted_result = address_completer.complete_extract_response(formatted_result)
-                except Exception as e:
-                    logger.warning(f"地址补全失败，返回原始结果: {str(e)}")
-            
-            return formatted_result
-            
+            schema = config_manager.load_entity_config()
         except Exception as e:
-            # 记录推理结束时间并计算耗时（即使失败也记录）
-            inference_end_time = time.time()
-            inference_duration = inference_end_time - inference_start_time
-            
-            # 记录推理时间到日志（失败情况）
-            logger.error(
-                f"推理时间记录 - 方法: extract_entities | "
-                f"模型: {request.model} | "
-                f"文本长度: {len(request.Content)} | "
-                f"推理耗时: {inference_duration:.4f}秒 ({inference_duration*1000:.2f}毫秒) | "
-                f"状态: 失败 | "
-                f"错误: {str(e)}"
+            raise HTTPException(
+                status_code=400,
+                detail=f"schema字段为空且无法加载默认配置: {str(e)}"
             )
-            raise HTTPException(status_code=500, detail=f"实体抽取失败: {str(e)}")
     
-    except HTTPException:
-        raise
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"服务器内部错误: {str(e)}")
+    return list(files_content), list(files_content.values()), schema
+
+
+async def _extract_files_in_chunks(model, filenames: list, texts: list, schema,
+                                   chunk_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    将文件按批大小分块，各块并发执行批量推理（并发数受推理信号量限制）
+    
+    Returns:
+        文件名到抽取结果的字典，格式与 model.extract_from_files 一致
+    """
+    tasks = [
+        asyncio.ensure_future(run_inference(model.extract_entities_batch, texts[start:start + chunk_size], schema))
+        for start in range(0, len(texts), chunk_size)
+    ]
+    try:
+        chunk_results = await asyncio.gather(*tasks)
+    finally:
+        # 某一块失败（或请求被取消）时取消其余尚未完成的块，不再占用推理信号量和推理线程
+        for task in tasks:
+            task.cancel()
+    return dict(zip(filenames, chain.from_iterable(chunk_results)))
 
 
-@router.post("/api/batch/extract", response_model=BatchExtractResponse, tags=["实体抽取"])
+@router.post("/api/batch/extract", responses={200: {"model": BatchExtractResponse}}, tags=["实体抽取"])
 async def batch_extract_entities(
     request: BatchExtractRequest,
     model_manager=Depends(get_model_manager),
@@ -153,132 +329,192 @@ async def batch_extract_entities(
     
     使用files字段：直接提供文件内容列表
     """
-    from datetime import datetime
+    # 响应时间戳在请求开始时生成一次
+    timestamp = now_iso()
+    
+    filenames, texts, schema = _prepare_batch_request(request, config_manager)
+    read_errors = []
     
+    # 验证模型名称并加载模型
+    model = await load_requested_model(model_manager, request.model)
+    
+    # 执行批量实体抽取
+    # 记录推理开始时间
+    inference_start_ns = time.perf_counter_ns()
     try:
-        # 获取文件内容字典
-        files_content = {}
-        read_errors = []
-        
-        # 直接提供文件内容列表
-        if request.files:
-            for file_item in request.files:
-                files_content[file_item.filename] = file_item.content
+        if hasattr(model, 'extract_entities_batch'):
+            results = await _extract_files_in_chunks(model, filenames, texts, schema)
+        elif hasattr(model, 'aextract_from_files'):
+            # 远程模型的各文件请求并发发出
+            results = dict(zip(filenames, await model.aextract_from_files(texts, schema)))
         else:
-            raise HTTPException(
-                status_code=400,
-                detail="请提供files字段（文件内容列表）"
+            results = await run_inference(model.extract_from_files, dict(zip(filenames, texts)), schema)
+        
+        # 记录推理时间到日志（INFO关闭时不计算耗时和总文本长度）
+        if logger.isEnabledFor(logging.INFO):
+            inference_duration = (time.perf_counter_ns() - inference_start_ns) / 1e9
+            total_text_length = sum(map(len, texts))
+            logger.info(
+                "推理时间记录 - 方法: extract_from_files | 模型: %s | 文件数量: %d | 总文本长度: %d | "
+                "推理耗时: %.4f秒 (%.2f毫秒) | 平均每文件耗时: %.4f秒 | 状态: 成功",
+                request.model, len(filenames), total_text_length,
+                inference_duration, inference_duration * 1000, inference_duration / len(filenames)
             )
         
-        if not files_content:
-            raise HTTPException(status_code=400, detail="没有有效的文件内容需要处理")
+        # 检查结果中是否有错误
+        has_error = False
+        error_files = []
+        for filename, result in results.items():
+            if "error" in result:
+                has_error = True
+                error_files.append(filename)
         
-        # 获取schema（可选，默认使用entity_config.json）
-        schema = request.schema
-        if not schema:
-            try:
-                schema = config_manager.load_entity_config()
-            except Exception as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"schema字段为空且无法加载默认配置: {str(e)}"
-                )
+        # 准备返回数据
+        response_data = {
+            "status": "success",
+            "data": {
+                "files_count": len(results),
+                "results": results,
+                "model": request.model,
+                "schema": schema
+            },
+            "timestamp": timestamp
+        }
         
-        # 验证模型名称
-        if request.model not in model_manager.SUPPORTED_MODELS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"不支持的模型: {request.model}。支持的模型: {list(model_manager.SUPPORTED_MODELS.keys())}"
-            )
+        # 添加警告信息
+        warnings = {}
+        if read_errors:
+            warnings["read_errors"] = read_errors
+            warnings["message"] = f"{len(read_errors)} 个文件读取失败"
         
-        # 加载模型
-        try:
-            model = model_manager.load_model(request.model)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"模型加载失败: {str(e)}")
+        if has_error:
+            if "message" in warnings:
+                warnings["message"] += f", {len(error_files)} 个文件处理失败"
+            else:
+                warnings["message"] = f"{len(error_files)} 个文件处理失败"
+            warnings["error_files"] = error_files
         
-        # 执行批量实体抽取
-        # 记录推理开始时间
-        inference_start_time = time.time()
+        if warnings:
+            response_data["warnings"] = warnings
+        
+        return response_data
+        
+    except Exception as e:
+        # 记录推理结束时间并计算耗时（即使失败也记录）
+        inference_duration = (time.perf_counter_ns() - inference_start_ns) / 1e9
+        
+        # 记录推理时间到日志（失败情况）
+        total_text_length = sum(map(len, texts))
+        logger.error(
+            "推理时间记录 - 方法: extract_from_files | 模型: %s | 文件数量: %d | 总文本长度: %d | "
+            "推理耗时: %.4f秒 (%.2f毫秒) | 状态: 失败 | 错误: %s",
+            request.model, len(filenames), total_text_length,
+            inference_duration, inference_duration * 1000, e
+        )
+        raise HTTPException(status_code=500, detail=f"批量实体抽取失败: {str(e)}")
+
+
+async def _extract_file(model, filename: str, content: str, schema):
+    """对单个文件执行实体抽取，失败时返回包含error字段的结果而不是抛出异常"""
+    try:
+        result = await run_single_inference(model, content, schema)
+    except Exception as e:
+        logger.error("文件实体抽取失败 - 文件: %s | 错误: %s", filename, e)
+        result = {"text": content, "entities": {}, "error": f"实体抽取失败: {str(e)}"}
+    return [(filename, result)]
+
+
+async def _extract_chunk(model, filenames: list, texts: list, schema):
+    """对一块文件执行批量推理，失败时该块每个文件都返回包含error字段的结果"""
+    try:
+        results = await run_inference(model.extract_entities_batch, texts, schema)
+    except Exception as e:
+        logger.error("文件批量实体抽取失败 - 文件数量: %d | 错误: %s", len(texts), e)
+        results = [
+            {"text": content, "entities": {}, "error": f"实体抽取失败: {str(e)}"}
+            for content in texts
+        ]
+    return list(zip(filenames, results))
+
+
+def _ndjson_line(data: dict) -> bytes:
+    """序列化为一行NDJSON"""
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
+
+@router.post("/api/batch/extract/stream", tags=["实体抽取"])
+async def batch_extract_entities_stream(
+    request: BatchExtractRequest,
+    model_manager=Depends(get_model_manager),
+    config_manager=Depends(get_config_manager)
+):
+    """
+    批量实体抽取接口（流式返回）
+    
+    请求格式与 /api/batch/extract 相同。以NDJSON格式返回：第一行为本次请求的元信息，
+    之后每个文件处理完成后立即返回一行结果，按完成顺序输出，客户端无需等待全部文件处理完毕：
+    {"meta": {"model": "...", "files_count": 2, "schema": {...}, "timestamp": "..."}}
+    {"filename": "file1.txt", "result": {...}}
+    {"summary": {"files_count": 2, "timestamp": "...", "warnings": {...}}}
+    
+    最后一行为汇总信息（只有全部文件处理完毕才会输出，客户端可据此判断结果是否完整），
+    有文件处理失败时包含warnings字段，格式与 /api/batch/extract 的warnings一致。
+    支持批量推理的模型按批大小分块推理，每块完成后输出该块内的文件结果。
+    适用于文件数量较多的批量任务。
+    """
+    timestamp = now_iso()
+    filenames, texts, schema = _prepare_batch_request(request, config_manager)
+    model = await load_requested_model(model_manager, request.model)
+    
+    async def generate():
+        yield _ndjson_line({
+            "meta": {
+                "model": request.model,
+                "files_count": len(filenames),
+                "schema": schema,
+                "timestamp": timestamp
+            }
+        })
+        
+        inference_start_ns = time.perf_counter_ns()
+        if hasattr(model, 'extract_entities_batch'):
+            tasks = [
+                asyncio.ensure_future(_extract_chunk(
+                    model, filenames[start:start + DEFAULT_BATCH_SIZE], texts[start:start + DEFAULT_BATCH_SIZE], schema
+                ))
+                for start in range(0, len(texts), DEFAULT_BATCH_SIZE)
+            ]
+        else:
+            tasks = [
+                asyncio.ensure_future(_extract_file(model, filename, content, schema))
+                for filename, content in zip(filenames, texts)
+            ]
+        error_files = []
         try:
-            results = model.extract_from_files(files_content, schema)
-            
-            # 记录推理结束时间并计算耗时
-            inference_end_time = time.time()
-            inference_duration = inference_end_time - inference_start_time
-            
-            # 记录推理时间到日志
-            total_text_length = sum(len(content) for content in files_content.values())
+            for next_done in asyncio.as_completed(tasks):
+                for filename, result in await next_done:
+                    if "error" in result:
+                        error_files.append(filename)
+                    yield _ndjson_line({"filename": filename, "result": result})
+        finally:
+            # 客户端提前断开时取消尚未开始的推理任务
+            for task in tasks:
+                task.cancel()
+        
+        if logger.isEnabledFor(logging.INFO):
+            inference_duration = (time.perf_counter_ns() - inference_start_ns) / 1e9
             logger.info(
-                f"推理时间记录 - 方法: extract_from_files | "
-                f"模型: {request.model} | "
-                f"文件数量: {len(files_content)} | "
-                f"总文本长度: {total_text_length} | "
-                f"推理耗时: {inference_duration:.4f}秒 ({inference_duration*1000:.2f}毫秒) | "
-                f"平均每文件耗时: {inference_duration/len(files_content):.4f}秒 | "
-                f"状态: 成功"
+                "推理时间记录 - 方法: extract_entities(stream) | 模型: %s | 文件数量: %d | "
+                "推理耗时: %.4f秒 (%.2f毫秒) | 状态: 完成",
+                request.model, len(filenames), inference_duration, inference_duration * 1000
             )
-            
-            # 检查结果中是否有错误
-            has_error = False
-            error_files = []
-            for filename, result in results.items():
-                if "error" in result:
-                    has_error = True
-                    error_files.append(filename)
-            
-            # 准备返回数据
-            response_data = {
-                "status": "success",
-                "data": {
-                    "files_count": len(results),
-                    "results": results,
-                    "model": request.model,
-                    "schema": schema
-                },
-                "timestamp": datetime.now().isoformat()
+        
+        summary = {"files_count": len(filenames), "timestamp": now_iso()}
+        if error_files:
+            summary["warnings"] = {
+                "message": f"{len(error_files)} 个文件处理失败",
+                "error_files": error_files
             }
-            
-            # 添加警告信息
-            warnings = {}
-            if read_errors:
-                warnings["read_errors"] = read_errors
-                warnings["message"] = f"{len(read_errors)} 个文件读取失败"
-            
-            if has_error:
-                if "message" in warnings:
-                    warnings["message"] += f", {len(error_files)} 个文件处理失败"
-                else:
-                    warnings["message"] = f"{len(error_files)} 个文件处理失败"
-                warnings["error_files"] = error_files
-            
-            if warnings:
-                response_data["warnings"] = warnings
-            
-            return response_data
-            
-        except Exception as e:
-            # 记录推理结束时间并计算耗时（即使失败也记录）
-            inference_end_time = time.time()
-            inference_duration = inference_end_time - inference_start_time
-            
-            # 记录推理时间到日志（失败情况）
-            total_text_length = sum(len(content) for content in files_content.values())
-            logger.error(
-                f"推理时间记录 - 方法: extract_from_files | "
-                f"模型: {request.model} | "
-                f"文件数量: {len(files_content)} | "
-                f"总文本长度: {total_text_length} | "
-                f"推理耗时: {inference_duration:.4f}秒 ({inference_duration*1000:.2f}毫秒) | "
-                f"状态: 失败 | "
-                f"错误: {str(e)}"
-            )
-            raise HTTPException(status_code=500, detail=f"批量实体抽取失败: {str(e)}")
+        yield _ndjson_line({"summary": summary})
     
-    except HTTPException:
-        raise
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"服务器内部错误: {str(e)}")
-
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -2,33 +2,60 @@
 系统相关路由
 包括健康检查、模型列表等
 """
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Depends
 from src.api.schemas import HealthResponse, ModelsResponse
-from src.api.dependencies import get_model_manager
+from src.api.dependencies import get_model_manager, get_config_manager, get_inference_cache, get_address_completer, get_response_cache
+from src.api.errors import ErrorLoggingRoute
+from src.utils.timestamp import now_iso
 
-router = APIRouter()
+router = APIRouter(route_class=ErrorLoggingRoute)
 
 
-@router.get("/api/health", response_model=HealthResponse, tags=["系统"])
+# 与 /api/extract 一样直接返回字典，由ORJSONResponse序列化，不经过response_model校验；
+# 健康检查会被负载均衡频繁调用，responses 参数仅用于生成接口文档
+@router.get("/api/health", responses={200: {"model": HealthResponse}}, tags=["系统"])
 async def health_check():
     """健康检查接口"""
     return {
         "status": "ok",
         "message": "NER API服务运行正常",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now_iso()
     }
 
 
-@router.get("/api/models", response_model=ModelsResponse, tags=["模型"])
+@router.get("/api/models", responses={200: {"model": ModelsResponse}}, tags=["模型"])
 async def list_models(model_manager=Depends(get_model_manager)):
     """获取支持的模型列表"""
-    try:
-        models = model_manager.list_models()
-        return {
-            "status": "success",
-            "models": models,
-            "count": len(models)
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取模型列表失败: {str(e)}")
+    models = model_manager.list_models()
+    return {
+        "status": "success",
+        "models": models,
+        "count": len(models)
+    }
+
+
+@router.get("/api/cache/stats", tags=["系统"])
+async def cache_stats(inference_cache=Depends(get_inference_cache),
+                      response_cache=Depends(get_response_cache),
+                      address_completer=Depends(get_address_completer)):
+    """获取推理结果缓存、完整响应缓存和区域查询缓存统计（当前worker进程）"""
+    return {
+        "status": "success",
+        "cache": inference_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "region_cache": address_completer.cache_stats() if address_completer else None
+    }
+
+
+@router.post("/api/config/reload", tags=["系统"])
+async def reload_config(config_manager=Depends(get_config_manager),
+                        response_cache=Depends(get_response_cache)):
+    """重新加载实体配置文件（当前worker进程），并清空依赖output_schema的完整响应缓存"""
+    entity_config = config_manager.reload()
+    response_cache.clear()
+    return {
+        "status": "success",
+        "message": "实体配置已重新加载",
+        "entities_count": len(entity_config),
+        "timestamp": now_iso()
+    }
@@ -2,17 +2,30 @@
 API 请求和响应的 Pydantic 模型定义
 """
 from typing import Dict, Any, Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, SkipValidation
 
+# 透传给模型的schema字典：跳过逐层校验，避免每个请求都遍历复制任意结构的字典
+SchemaDict = SkipValidation[Dict[str, Any]]
 
-class HealthResponse(BaseModel):
+
+class DocResponseModel(BaseModel):
+    """
+    仅用于生成接口文档的响应模型基类
+
+    各接口直接返回字典，由ORJSONResponse序列化，运行时不会用这些模型校验；
+    延迟到首次使用（生成OpenAPI文档）时才构建校验器和序列化器，减少启动耗时和内存占用
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+class HealthResponse(DocResponseModel):
     """健康检查响应"""
     status: str
     message: str
     timestamp: str
 
 
-class ModelsResponse(BaseModel):
+class ModelsResponse(DocResponseModel):
     """模型列表响应"""
     status: str
     models: List[str]
@@ -26,10 +39,10 @@ class ExtractRequest(BaseModel):
         default="qwen-flash",
         description="模型名称（可选）"
     )
-    schema: Optional[Dict[str, Any]] = Field(None, description="实体抽取schema，指定要抽取的实体类型（qwen-flash模型不使用此参数）")
+    schema: Optional[SchemaDict] = Field(None, description="实体抽取schema，指定要抽取的实体类型（qwen-flash模型不使用此参数）")
 
 
-class ExtractResponse(BaseModel):
+class ExtractResponse(DocResponseModel):
     """实体抽取响应"""
     EBusinessID: str = Field(..., description="业务ID")
     Data: Dict[str, Any] = Field(..., description="提取的实体数据")
@@ -51,10 +64,10 @@ class BatchExtractRequest(BaseModel):
         default="nlp_structbert_siamese-uie_chinese-base",
         description="模型名称（可选）"
     )
-    schema: Optional[Dict[str, Any]] = Field(None, description="实体抽取schema（可选，默认使用entity_config.json）")
+    schema: Optional[SchemaDict] = Field(None, description="实体抽取schema（可选，默认使用entity_config.json）")
 
 
-class BatchExtractResponse(BaseModel):
+class BatchExtractResponse(DocResponseModel):
     """批量实体抽取响应"""
     status: str
     data: Optional[Dict[str, Any]] = None
@@ -62,14 +75,14 @@ class BatchExtractResponse(BaseModel):
     timestamp: str
 
 
-class UploadResponse(BaseModel):
+class UploadResponse(DocResponseModel):
     """文件上传响应"""
     status: str
     data: Optional[Dict[str, Any]] = None
     timestamp: str
 
 
-class MultipleUploadResponse(BaseModel):
+class MultipleUploadResponse(DocResponseModel):
     """多文件上传响应"""
     status: str
     data: Optional[Dict[str, Any]] = None
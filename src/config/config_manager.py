@@ -3,9 +3,13 @@
 处理实体配置
 """
 import os
-import json
+import logging
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+import orjson
+
+logger = logging.getLogger("NER_API")
 
 
 class ConfigManager:
@@ -22,6 +26,10 @@ class ConfigManager:
         default_config_path = Path(__file__).parent.parent / 'entity_config.json'
         self.entity_config_path = Path(entity_config_path) if entity_config_path else default_config_path
         self.config = {}
+        # 实体配置缓存：(文件修改时间ns, 实体配置, 版本号)，文件修改时间变化或调用reload()后重新读取文件
+        self._entity_config = None
+        self._entity_config_version = 0
+        self._entity_config_lock = threading.Lock()
     
     def get_config(self, key: str, default: Any = None) -> Any:
         """获取配置项（保留接口兼容性）"""
@@ -29,23 +37,85 @@ class ConfigManager:
     
     def load_entity_config(self) -> Dict[str, Any]:
         """
-        加载实体配置文件
+        加载实体配置（文件未修改时返回缓存结果，每次调用只需一次stat系统调用；文件修改后自动重新读取）
         
         Returns:
             实体配置字典
         """
+        try:
+            mtime_ns = self.entity_config_path.stat().st_mtime_ns
+        except OSError:
+            # 配置文件不存在
+            mtime_ns = None
+        
+        cached = self._entity_config
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        
+        # 多个线程同时发现文件变化时只读取一次
+        with self._entity_config_lock:
+            cached = self._entity_config
+            if cached is None or cached[0] != mtime_ns:
+                self._entity_config_version += 1
+                cached = (mtime_ns, self._read_entity_config(), self._entity_config_version)
+                self._entity_config = cached
+            return cached[1]
+    
+    def get_config_version(self) -> int:
+        """
+        获取实体配置的版本号（每次重新读取配置文件后加1，文件未修改时只需一次stat系统调用）
+        
+        依赖实体配置的缓存把版本号放入缓存键，配置文件修改后旧的缓存条目不再命中
+        """
+        self.load_entity_config()
+        return self._entity_config[2]
+    
+    def get_output_schema(self) -> Optional[Dict[str, Any]]:
+        """
+        获取实体配置中的output_schema（输出格式映射），未配置时返回None
+        
+        与实体配置共用缓存，调用reload()后随之更新
+        """
+        entity_config = self.load_entity_config()
+        if isinstance(entity_config, dict):
+            return entity_config.get('output_schema')
+        return None
+    
+    def reload(self) -> Dict[str, Any]:
+        """
+        清除缓存并重新读取实体配置文件
+        
+        Returns:
+            重新加载后的实体配置字典
+        """
+        with self._entity_config_lock:
+            self._entity_config = None
+        return self.load_entity_config()
+    
+    def _read_entity_config(self) -> Dict[str, Any]:
+        """从文件读取实体配置"""
         if not self.entity_config_path.exists():
             # 如果配置文件不存在，返回空配置
             return {}
         
         try:
-            with open(self.entity_config_path, 'r', encoding='utf-8') as f:
-                entity_config = json.load(f)
-            
-            return entity_config.get('entities', {})
-        except Exception as e:
+            # orjson直接解析UTF-8字节，无需先解码为字符串
+            entity_config = orjson.loads(self.entity_config_path.read_bytes())
+        except (OSError, ValueError) as e:
             # 如果加载失败，返回空配置
+            logger.warning("实体配置文件读取失败，使用空配置 - 文件: %s | 错误: %s", self.entity_config_path, e)
+            return {}
+        
+        if not isinstance(entity_config, dict):
+            # 顶层不是JSON对象（如数组、字符串）时没有entities字段，返回空配置
+            logger.warning("实体配置文件格式错误，顶层应为JSON对象，使用空配置 - 文件: %s", self.entity_config_path)
+            return {}
+        
+        entities = entity_config.get('entities', {})
+        if not isinstance(entities, dict):
+            logger.warning("实体配置文件格式错误，entities应为JSON对象，使用空配置 - 文件: %s", self.entity_config_path)
             return {}
+        return entities
     
     def get_model_path(self) -> str:
         """获取模型路径（保留接口兼容性，返回默认值）"""
@@ -2,7 +2,7 @@
 常量定义模块
 集中管理项目中使用的常量
 """
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 # 模型相关常量
 SUPPORTED_MODELS: Dict[str, str] = {
@@ -13,6 +13,15 @@ SUPPORTED_MODELS: Dict[str, str] = {
     'qwen-flash': None  # qwen-flash不需要本地模型路径，使用API调用
 }
 
+# 支持的模型名称集合（用于O(1)成员判断）
+SUPPORTED_MODEL_NAMES: frozenset = frozenset(SUPPORTED_MODELS)
+
+# 按配置顺序排列的模型名称（用于列表展示）
+SUPPORTED_MODEL_NAMES_LIST: Tuple[str, ...] = tuple(SUPPORTED_MODELS)
+
+# 支持的模型列表说明（模块加载时生成一次，用于错误提示）
+SUPPORTED_MODELS_DETAIL: str = f"支持的模型: {list(SUPPORTED_MODEL_NAMES_LIST)}"
+
 MODEL_TYPES: Dict[str, str] = {
     'chinese-macbert-base': 'macbert',
     'nlp_structbert_siamese-uie_chinese-base': 'siamese_uie',
@@ -22,7 +31,7 @@ MODEL_TYPES: Dict[str, str] = {
 }
 
 # 文件扩展名
-SUPPORTED_FILE_EXTENSIONS: set = {'.txt', '.md', '.docx', '.doc', '.pdf'}
+SUPPORTED_FILE_EXTENSIONS: frozenset = frozenset({'.txt', '.md', '.docx', '.doc', '.pdf'})
 
 # 地址相关常量
 ADDRESS_KEYWORDS: List[str] = [
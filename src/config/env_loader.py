@@ -37,7 +37,7 @@ def get_local_ip() -> Optional[str]:
         s.close()
         return ip
     except Exception as e:
-        logger.warning(f"获取本地IP地址失败: {e}")
+        logger.warning("获取本地IP地址失败: %s", e)
         return None
 
 
@@ -58,21 +58,21 @@ def get_current_domain() -> Optional[str]:
     # 优先从环境变量获取（适用于Web应用）
     domain = os.getenv('HTTP_HOST') or os.getenv('SERVER_NAME') or os.getenv('HOSTNAME')
     if domain:
-        logger.info(f"从环境变量获取域名: {domain}")
+        logger.info("从环境变量获取域名: %s", domain)
         return domain
     
     # 尝试从socket获取主机名
     try:
         hostname = socket.gethostname()
-        logger.info(f"从socket获取主机名: {hostname}")
+        logger.info("从socket获取主机名: %s", hostname)
         return hostname
     except Exception as e:
-        logger.warning(f"获取主机名失败: {e}")
+        logger.warning("获取主机名失败: %s", e)
     
     # 如果无法获取域名，尝试获取本地IP地址
     local_ip = get_local_ip()
     if local_ip:
-        logger.info(f"获取本地IP地址: {local_ip}")
+        logger.info("获取本地IP地址: %s", local_ip)
         return local_ip
     
     return None
@@ -89,15 +89,15 @@ def load_env_file(env_file: str) -> Dict[str, Any]:
         配置字典
     """
     if not Path(env_file).exists():
-        logger.warning(f"配置文件不存在: {env_file}")
+        logger.warning("配置文件不存在: %s", env_file)
         return {}
     
     try:
         config = dotenv_values(env_file)
-        logger.info(f"成功加载配置文件: {env_file}")
+        logger.info("成功加载配置文件: %s", env_file)
         return config
     except Exception as e:
-        logger.error(f"加载配置文件失败 {env_file}: {e}")
+        logger.error("加载配置文件失败 %s: %s", env_file, e)
         return {}
 
 
@@ -134,9 +134,9 @@ def load_config() -> Dict[str, Any]:
         show_domains = show_config.get('SHOW_DOMAINS', '').split(',')
         show_domains = [d.strip() for d in show_domains if d.strip()]
         
-        logger.info(f"当前域名: {current_domain}")
-        logger.info(f"开发环境域名列表: {dev_domains}")
-        logger.info(f"生产环境域名列表: {show_domains}")
+        logger.info("当前域名: %s", current_domain)
+        logger.info("开发环境域名列表: %s", dev_domains)
+        logger.info("生产环境域名列表: %s", show_domains)
         
         # 检查是否在生产环境域名列表中（优先匹配）
         for domain in show_domains:
@@ -161,7 +161,7 @@ def load_config() -> Dict[str, Any]:
                         pass
                 
                 if is_match:
-                    logger.info(f"当前域名/IP {current_domain} 在生产环境域名列表中，加载 show.env")
+                    logger.info("当前域名/IP %s 在生产环境域名列表中，加载 show.env", current_domain)
                     return load_env_file(str(show_env_file))
         
         # 检查是否在开发环境域名列表中
@@ -189,15 +189,15 @@ def load_config() -> Dict[str, Any]:
                         pass
                 
                 if is_match:
-                    logger.info(f"当前域名/IP {current_domain} 在开发环境域名列表中，加载 dev.env")
+                    logger.info("当前域名/IP %s 在开发环境域名列表中，加载 dev.env", current_domain)
                     return load_env_file(str(dev_env_file))
         
         # 默认使用开发环境配置
-        logger.info(f"当前域名 {current_domain} 未匹配到任何环境，默认使用 dev.env")
+        logger.info("当前域名 %s 未匹配到任何环境，默认使用 dev.env", current_domain)
         return load_env_file(str(dev_env_file))
         
     except Exception as e:
-        logger.error(f"加载配置文件失败: {e}")
+        logger.error("加载配置文件失败: %s", e)
         # 返回空字典或默认配置
         project_root = Path(__file__).parent.parent
         return load_env_file(str(project_root / "dev.env"))
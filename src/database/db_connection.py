@@ -3,7 +3,10 @@ MySQL数据库连接模块
 支持通过环境变量配置数据库连接
 """
 import os
+import time
+import queue
 import logging
+import threading
 from typing import Optional, Dict, Any, List
 from contextlib import contextmanager
 import pymysql
@@ -27,6 +30,12 @@ class DatabaseConnection:
         # 连接池配置
         self.max_connections = int(os.getenv('MYSQL_MAX_CONNECTIONS', '10')) # 连接池最大连接数
         self.connect_timeout = int(os.getenv('MYSQL_CONNECT_TIMEOUT', '10')) # 连接超时时间
+        self.pool_recycle = int(os.getenv('MYSQL_POOL_RECYCLE', '1800')) # 连接最长复用时间（秒），超过后重新建立
+        
+        # 空闲连接池：元素为 (连接, 创建时间)，后进先出以优先复用最近使用过的连接
+        self._pool = queue.LifoQueue(maxsize=self.max_connections)
+        self._pool_lock = threading.Lock()
+        self._created_connections = 0
         
         # 验证必要配置
         if not self.database:
@@ -56,36 +65,99 @@ class DatabaseConnection:
             )
             return connection
         except Exception as e:
-            logger.error(f"数据库连接失败: {str(e)}")
+            logger.error("数据库连接失败: %s", e)
             raise
     
+    def _acquire_connection(self):
+        """
+        从连接池获取连接
+        
+        优先复用空闲连接（超过复用时间的连接会被关闭重建，复用前先ping检测连接是否可用）；
+        没有空闲连接且未达到最大连接数时新建连接，否则等待其他请求归还连接。
+        
+        Returns:
+            tuple: (连接对象, 创建时间)
+        """
+        while True:
+            try:
+                connection, created_at = self._pool.get_nowait()
+            except queue.Empty:
+                with self._pool_lock:
+                    can_create = self._created_connections < self.max_connections
+                    if can_create:
+                        self._created_connections += 1
+                if can_create:
+                    try:
+                        return self.get_connection(), time.monotonic()
+                    except Exception:
+                        with self._pool_lock:
+                            self._created_connections -= 1
+                        raise
+                try:
+                    connection, created_at = self._pool.get(timeout=self.connect_timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"获取数据库连接超时（最大连接数: {self.max_connections}）")
+            
+            if time.monotonic() - created_at > self.pool_recycle:
+                self._discard_connection(connection)
+                continue
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                self._discard_connection(connection)
+                continue
+            return connection, created_at
+    
+    def _release_connection(self, connection, created_at: float):
+        """将连接归还到连接池"""
+        try:
+            self._pool.put_nowait((connection, created_at))
+        except queue.Full:
+            self._discard_connection(connection)
+    
+    def _discard_connection(self, connection):
+        """关闭连接并释放连接池名额"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._pool_lock:
+            self._created_connections -= 1
+    
     @contextmanager
     def get_cursor(self):
         """
-        获取数据库游标的上下文管理器
+        获取数据库游标的上下文管理器（连接从连接池获取，使用后归还）
         
         Usage:
             with db.get_cursor() as cursor:
                 cursor.execute("SELECT * FROM table")
                 results = cursor.fetchall()
         """
-        connection = None
+        connection, created_at = self._acquire_connection()
         cursor = None
+        reusable = True
         try:
-            connection = self.get_connection()
             cursor = connection.cursor()
             yield cursor
             connection.commit()
         except Exception as e:
-            if connection:
+            try:
                 connection.rollback()
-            logger.error(f"数据库操作失败: {str(e)}")
+            except Exception:
+                reusable = False
+            logger.error("数据库操作失败: %s", e)
             raise
         finally:
             if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+                try:
+                    cursor.close()
+                except Exception:
+                    reusable = False
+            if reusable and connection.open:
+                self._release_connection(connection, created_at)
+            else:
+                self._discard_connection(connection)
     
     def execute_query(self, sql: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
         """
@@ -129,6 +201,14 @@ class DatabaseConnection:
                 cursor.execute("SELECT 1")
                 return True
         except Exception as e:
-            logger.error(f"数据库连接测试失败: {str(e)}")
+            logger.error("数据库连接测试失败: %s", e)
             return False
-
+    
+    def close(self):
+        """关闭连接池中的所有空闲连接"""
+        while True:
+            try:
+                connection, _ = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            self._discard_connection(connection)
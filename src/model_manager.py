@@ -2,13 +2,16 @@
 模型管理器
 支持多个模型的动态加载和缓存
 """
+import threading
 from pathlib import Path
 from typing import Dict, Optional, Union
 from .models import (
     SiameseUIEModel, MacBERTModel, MGeoGeographicCompositionAnalysisModel,
     MGeoGeographicElementsTaggingModel, QwenFlashModel
 )
-from .config.constants import SUPPORTED_MODELS, MODEL_TYPES
+from .config.constants import (
+    SUPPORTED_MODELS, SUPPORTED_MODEL_NAMES, SUPPORTED_MODEL_NAMES_LIST, SUPPORTED_MODELS_DETAIL, MODEL_TYPES
+)
 
 
 class ModelManager:
@@ -16,6 +19,8 @@ class ModelManager:
     
     # 支持的模型映射（从常量文件导入）
     SUPPORTED_MODELS = SUPPORTED_MODELS
+    SUPPORTED_MODEL_NAMES = SUPPORTED_MODEL_NAMES
+    SUPPORTED_MODEL_NAMES_LIST = SUPPORTED_MODEL_NAMES_LIST
     
     # 模型类型映射（从常量文件导入）
     MODEL_TYPES = MODEL_TYPES
@@ -35,6 +40,18 @@ class ModelManager:
         
         self.models: Dict[str, Union[SiameseUIEModel, MacBERTModel, MGeoGeographicCompositionAnalysisModel, MGeoGeographicElementsTaggingModel, QwenFlashModel]] = {}
         self.current_model_name: Optional[str] = None
+        
+        # 每个模型一把加载锁，避免并发的首次请求重复加载同一个模型
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._load_locks_guard = threading.Lock()
+    
+    def _get_load_lock(self, model_name: str) -> threading.Lock:
+        """获取指定模型的加载锁"""
+        with self._load_locks_guard:
+            lock = self._load_locks.get(model_name)
+            if lock is None:
+                lock = self._load_locks[model_name] = threading.Lock()
+            return lock
     
     def get_model_path(self, model_name: str) -> Optional[Path]:
         """
@@ -46,11 +63,8 @@ class ModelManager:
         Returns:
             模型路径（qwen-flash返回None，因为不需要本地路径）
         """
-        if model_name not in self.SUPPORTED_MODELS:
-            raise ValueError(
-                f"不支持的模型: {model_name}。"
-                f"支持的模型: {list(self.SUPPORTED_MODELS.keys())}"
-            )
+        if model_name not in self.SUPPORTED_MODEL_NAMES:
+            raise ValueError(f"不支持的模型: {model_name}。{SUPPORTED_MODELS_DETAIL}")
         
         # qwen-flash不需要本地模型路径
         if model_name == 'qwen-flash':
@@ -84,6 +98,15 @@ class ModelManager:
             self.current_model_name = model_name
             return self.models[model_name]
         
+        with self._get_load_lock(model_name):
+            # 等待锁期间其他线程可能已完成加载
+            if model_name in self.models and not force_reload:
+                self.current_model_name = model_name
+                return self.models[model_name]
+            return self._load_model_locked(model_name)
+    
+    def _load_model_locked(self, model_name: str) -> Union[SiameseUIEModel, MacBERTModel, MGeoGeographicCompositionAnalysisModel, MGeoGeographicElementsTaggingModel, QwenFlashModel]:
+        """在持有模型加载锁的情况下创建模型实例"""
         # 加载新模型
         print(f"正在加载模型: {model_name}")
         
@@ -138,7 +161,7 @@ class ModelManager:
     
     def list_models(self) -> list:
         """获取支持的模型列表"""
-        return list(self.SUPPORTED_MODELS.keys())
+        return list(self.SUPPORTED_MODEL_NAMES_LIST)
     
     def unload_model(self, model_name: str):
         """
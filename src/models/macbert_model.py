@@ -3,6 +3,7 @@ MacBERT模型调用模块
 使用chinese-macbert-base模型进行实体抽取
 支持命名实体识别任务（基于规则方法）
 """
+import logging
 import os
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
@@ -10,6 +11,8 @@ import torch
 from transformers import AutoTokenizer, AutoModel
 import re
 
+logger = logging.getLogger("NER_API")
+
 
 class MacBERTModel:
     """MacBERT模型封装类，支持命名实体识别任务"""
@@ -41,9 +44,7 @@ class MacBERTModel:
             print(f"MacBERT模型加载成功！使用设备: {self.device}")
         except Exception as e:
             error_msg = f"MacBERT模型加载失败: {str(e)}"
-            print(f"错误详情: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("错误详情: %s", error_msg)
             raise Exception(error_msg)
     
     def extract_entities(self, text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
@@ -97,9 +98,7 @@ class MacBERTModel:
             
         except Exception as e:
             error_msg = f"实体抽取出错: {str(e)}"
-            print(f"错误详情: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("错误详情: %s", error_msg)
             return {
                 "text": text,
                 "entities": {},
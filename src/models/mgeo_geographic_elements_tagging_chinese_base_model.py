@@ -3,11 +3,16 @@ MGeo地理要素标注模型调用模块
 使用ModelScope的MGeo地理要素标注模型进行地理实体抽取和标注
 支持地址要素解析、地理要素标注等任务
 """
+import logging
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from modelscope.pipelines import pipeline
 from modelscope.utils.constant import Tasks
+from .pipeline_batch import apply_inference_precision, run_pipeline, run_pipeline_in_batches, DEFAULT_BATCH_SIZE
+from src.utils.numpy_utils import convert_numpy_types
+
+logger = logging.getLogger("NER_API")
 
 
 class MGeoGeographicElementsTaggingModel:
@@ -92,6 +97,8 @@ class MGeoGeographicElementsTaggingModel:
                         model_revision='master'
                     )
                     print("使用本地路径加载成功！")
+            
+            apply_inference_precision(self.pipeline)
         except Exception as e:
             error_msg = f"模型加载失败: {str(e)}"
             print(f"\n错误详情: {error_msg}")
@@ -110,8 +117,7 @@ class MGeoGeographicElementsTaggingModel:
                 print("   model/mgeo_geographic_elements_tagging_chinese_base/README.md")
                 print("="*60)
             
-            import traceback
-            traceback.print_exc()
+            logger.exception(error_msg)
             raise Exception(error_msg)
     
     def extract_entities(self, text: str, schema: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -163,53 +169,70 @@ class MGeoGeographicElementsTaggingModel:
         try:
             # MGeo模型使用token-classification任务，只需要input参数
             # 根据README示例：pipeline_ins(input=inputs)
-            result = self.pipeline(input=text)
-            
-            # 将numpy类型转换为Python原生类型（解决Pydantic序列化问题）
-            def convert_numpy_types(obj):
-                """递归转换numpy类型为Python原生类型"""
-                import numpy as np
-                if isinstance(obj, np.integer):
-                    return int(obj)
-                elif isinstance(obj, np.floating):
-                    return float(obj)
-                elif isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                elif isinstance(obj, dict):
-                    return {key: convert_numpy_types(value) for key, value in obj.items()}
-                elif isinstance(obj, (list, tuple)):
-                    return [convert_numpy_types(item) for item in obj]
-                else:
-                    return obj
-            
-            # 转换结果中的numpy类型
-            result = convert_numpy_types(result)
-            
-            # 确保返回格式一致
-            if result and isinstance(result, dict):
-                return {
-                    "text": text,
-                    "entities": result
-                }
-            else:
-                return {
-                    "text": text,
-                    "entities": {"output": result} if result else {}
-                }
+            result = run_pipeline(self.pipeline, input=text)
+            return self._format_result(text, result)
         except Exception as e:
             error_msg = f"实体抽取出错: {str(e)}"
-            print(f"错误详情: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("错误详情: %s", error_msg)
             return {
                 "text": text,
                 "entities": {},
                 "error": error_msg
             }
     
+    @staticmethod
+    def _format_result(text: str, result: Any) -> Dict[str, Any]:
+        """将pipeline输出转换为统一的返回格式"""
+        # 转换结果中的numpy类型
+        result = convert_numpy_types(result)
+        
+        # 确保返回格式一致
+        if result and isinstance(result, dict):
+            return {
+                "text": text,
+                "entities": result
+            }
+        else:
+            return {
+                "text": text,
+                "entities": {"output": result} if result else {}
+            }
+    
+    def extract_entities_batch(self, texts: List[str], schema: Dict[str, Any] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        批量抽取地理实体，多条文本分批一次性送入pipeline
+        
+        批量推理失败时自动退回逐条推理，返回格式与extract_entities一致。
+        
+        Args:
+            texts: 输入文本列表
+            schema: 实体抽取schema（MGeo模型不使用此参数）
+            batch_size: 每批文本数量
+            
+        Returns:
+            与texts一一对应的抽取结果列表
+        """
+        # 空文本不参与推理
+        results = [{"text": text, "entities": {}} for text in texts]
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not indices:
+            return results
+        
+        try:
+            outputs = run_pipeline_in_batches(self.pipeline, [texts[i] for i in indices], batch_size)
+        except Exception as e:
+            logger.warning("批量推理失败，改为逐条推理: %s", e)
+            for i in indices:
+                results[i] = self.extract_entities(texts[i], schema)
+            return results
+        
+        for i, output in zip(indices, outputs):
+            results[i] = self._format_result(texts[i], output)
+        return results
+    
     def extract_from_files(self, files_content: Dict[str, str], schema: Dict[str, Any]) -> Dict[str, Any]:
         """
-        从多个文件内容中抽取实体
+        从多个文件内容中抽取实体（批量推理）
         
         Args:
             files_content: 文件内容字典，key为文件名，value为文件内容
@@ -218,9 +241,7 @@ class MGeoGeographicElementsTaggingModel:
         Returns:
             抽取结果字典，key为文件名，value为抽取结果
         """
-        results = {}
-        for filename, content in files_content.items():
-            print(f"正在处理文件: {filename}")
-            results[filename] = self.extract_entities(content, schema)
-        return results
+        print(f"正在批量处理 {len(files_content)} 个文件")
+        results = self.extract_entities_batch(list(files_content.values()), schema)
+        return dict(zip(files_content.keys(), results))
 
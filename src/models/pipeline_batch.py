@@ -0,0 +1,122 @@
+"""
+ModelScope pipeline 推理工具
+在推理模式下调用pipeline，并支持将多条文本分批一次性送入pipeline，摊薄分词和模型调用开销
+"""
+import os
+import logging
+from typing import Any, List
+
+import torch
+
+logger = logging.getLogger("NER_API")
+
+# 默认批大小（可通过环境变量 NER_BATCH_SIZE 配置）
+DEFAULT_BATCH_SIZE = int(os.getenv('NER_BATCH_SIZE', '8'))
+
+# 推理精度：fp32（默认）、int8（CPU动态量化）、fp16（仅GPU）
+INFERENCE_PRECISION = os.getenv('NER_INFERENCE_PRECISION', 'fp32').strip().lower()
+
+
+def apply_inference_precision(pipeline: Any, precision: str = INFERENCE_PRECISION) -> str:
+    """
+    按配置转换pipeline中模型的推理精度
+    
+    - int8: 对Linear层做动态量化（仅CPU），权重体积减为约1/4，矩阵乘法使用int8内核
+    - fp16: 模型转换为半精度（仅GPU可用时生效）
+    - fp32: 保持原始精度
+    
+    转换失败或当前设备不支持时保持fp32，不影响模型使用。
+    
+    Args:
+        pipeline: ModelScope pipeline实例
+        precision: 目标精度
+        
+    Returns:
+        实际使用的精度
+    """
+    if precision == 'fp32':
+        return 'fp32'
+    
+    model = getattr(pipeline, 'model', None)
+    if not isinstance(model, torch.nn.Module):
+        logger.warning("pipeline中没有可转换的PyTorch模型，保持fp32精度")
+        return 'fp32'
+    
+    try:
+        if precision == 'int8':
+            if next(model.parameters()).is_cuda:
+                logger.warning("int8动态量化仅支持CPU推理，保持fp32精度")
+                return 'fp32'
+            # 原地替换Linear层，pipeline内部对模型的其他引用同样生效
+            torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        elif precision == 'fp16':
+            if not torch.cuda.is_available():
+                logger.warning("fp16推理需要GPU，保持fp32精度")
+                return 'fp32'
+            model.half()
+        else:
+            logger.warning("不支持的推理精度: %s，保持fp32精度", precision)
+            return 'fp32'
+    except Exception as e:
+        logger.warning("推理精度转换失败，保持fp32精度: %s", e)
+        return 'fp32'
+    
+    logger.info("模型推理精度: %s", precision)
+    return precision
+
+
+def run_pipeline(pipeline: Any, **kwargs) -> Any:
+    """
+    在 torch.inference_mode 下调用pipeline
+    
+    推理模式下不记录自动求导信息、不维护张量版本计数，比默认的梯度模式开销更小。
+    
+    Args:
+        pipeline: ModelScope pipeline实例
+        **kwargs: 传递给pipeline的参数（如input、schema）
+        
+    Returns:
+        pipeline输出
+    """
+    with torch.inference_mode():
+        return pipeline(**kwargs)
+
+
+def run_pipeline_in_batches(pipeline: Any, texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE, **kwargs) -> List[Any]:
+    """
+    分批调用pipeline进行推理
+    
+    批量推理出现RuntimeError（如显存不足）时将批大小减半后重试，
+    批大小降到1仍失败则向上抛出异常，由调用方决定是否逐条推理。
+    
+    Args:
+        pipeline: ModelScope pipeline实例
+        texts: 输入文本列表
+        batch_size: 每批文本数量
+        **kwargs: 传递给pipeline的其他参数（如schema）
+        
+    Returns:
+        与texts一一对应的pipeline输出列表
+    """
+    outputs = []
+    batch_size = max(1, batch_size)
+    start = 0
+    
+    while start < len(texts):
+        batch = texts[start:start + batch_size]
+        try:
+            batch_outputs = run_pipeline(pipeline, input=batch, batch_size=len(batch), **kwargs)
+        except RuntimeError as e:
+            if batch_size == 1:
+                raise
+            batch_size = max(1, batch_size // 2)
+            logger.warning("批量推理失败，批大小减半为 %d 后重试: %s", batch_size, e)
+            continue
+        
+        if not isinstance(batch_outputs, list) or len(batch_outputs) != len(batch):
+            raise ValueError("pipeline批量输出数量与输入不一致")
+        
+        outputs.extend(batch_outputs)
+        start += len(batch)
+    
+    return outputs
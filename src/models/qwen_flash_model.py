@@ -3,16 +3,37 @@ Qwen-Flash模型调用模块
 使用DashScope的qwen-flash大模型进行地址纠错、补全和实体提取
 一次性完成纠错、补全和实体提取，返回统一格式
 """
+import logging
 import os
 import json
 import re
-from typing import Dict, Any, Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from dashscope import Generation
 
+logger = logging.getLogger("NER_API")
+
+# 同时进行的远程调用数量上限，也是远程调用专用线程池的线程数
+QWEN_CONCURRENCY = int(os.getenv('QWEN_CONCURRENCY', '16'))
+
 
 class QwenFlashModel:
     """Qwen-Flash模型封装类，用于地址纠错、补全和实体提取"""
     
+    # 远程调用的耗时主要是等待网络往返，放在独立的线程池中并发执行，不占用本地模型的推理线程；
+    # 线程池和信号量在首次异步调用时创建（只在事件循环线程中访问，无需加锁），导入模块时不创建线程
+    _remote_executor: Optional[ThreadPoolExecutor] = None
+    _remote_semaphore: Optional[asyncio.Semaphore] = None
+    
+    @classmethod
+    def shutdown_remote_executor(cls):
+        """关闭远程调用线程池（服务关闭时调用），之后再次异步调用会重新创建"""
+        executor, cls._remote_executor = cls._remote_executor, None
+        cls._remote_semaphore = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def __init__(self, api_key: Optional[str] = None):
         """
         初始化Qwen-Flash模型
@@ -114,9 +135,7 @@ class QwenFlashModel:
             
         except Exception as e:
             error_msg = f"实体提取失败: {str(e)}"
-            print(f"错误详情: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("错误详情: %s", error_msg)
             return {
                 "EBusinessID": self.ebusiness_id,
                 "Data": {
@@ -133,6 +152,34 @@ class QwenFlashModel:
                 "ResultCode": "103"
             }
     
+    async def aextract_entities(self, text: str, schema: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        extract_entities 的异步版本，在远程调用线程池中执行，返回格式与 extract_entities 一致
+        
+        先获取信号量再提交任务：排队期间被取消的请求（如客户端断开）不会再占用线程
+        """
+        cls = QwenFlashModel
+        if cls._remote_executor is None:
+            cls._remote_executor = ThreadPoolExecutor(max_workers=QWEN_CONCURRENCY, thread_name_prefix="qwen-remote")
+            cls._remote_semaphore = asyncio.Semaphore(QWEN_CONCURRENCY)
+        async with cls._remote_semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                cls._remote_executor, self.extract_entities, text, schema
+            )
+    
+    async def aextract_from_files(self, texts: List[str], schema: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        并发抽取多段文本，各请求的网络往返时间相互重叠，总耗时接近最慢的一次调用而不是各次之和
+        
+        Args:
+            texts: 输入文本列表
+            schema: 实体抽取schema（qwen-flash模型不使用此参数）
+            
+        Returns:
+            与texts一一对应的抽取结果列表
+        """
+        return await asyncio.gather(*[self.aextract_entities(text, schema) for text in texts])
+    
     def _extract_components(self, text: str) -> Dict[str, str]:
         """
         从文本中提取人名、电话和地址信息
@@ -299,11 +346,11 @@ class QwenFlashModel:
                 corrected = response.output.text.strip()
                 return corrected
             else:
-                print(f"纠错失败: {response.message}")
+                logger.warning("纠错失败: %s", response.message)
                 return text
                 
         except Exception as e:
-            print(f"文本纠错出错: {str(e)}")
+            logger.error("文本纠错出错: %s", e, exc_info=True)
             return text
     
     def _complete_address_and_extract_entities(self, address_text: str) -> Dict[str, Any]:
@@ -364,10 +411,10 @@ class QwenFlashModel:
                         try:
                             address_info = json.loads(json_str)
                         except json.JSONDecodeError:
-                            print(f"JSON解析失败: {json_str}")
+                            logger.warning("JSON解析失败: %s", json_str)
                             return self._default_address_info()
                     else:
-                        print(f"未找到JSON格式: {result_text}")
+                        logger.warning("未找到JSON格式: %s", result_text)
                         return self._default_address_info()
                 
                 # 确保所有字段都存在，并转换为字符串
@@ -381,13 +428,11 @@ class QwenFlashModel:
                 
                 return result
             else:
-                print(f"地址补全失败: {response.message}")
+                logger.warning("地址补全失败: %s", response.message)
                 return self._default_address_info()
                 
         except Exception as e:
-            print(f"地址补全出错: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("地址补全出错: %s", e)
             return self._default_address_info()
     
     def _default_address_info(self) -> Dict[str, str]:
@@ -3,11 +3,15 @@ SiameseUIE模型调用模块
 使用ModelScope的SiameseUIE模型进行实体抽取
 支持命名实体识别、关系抽取、事件抽取、属性情感抽取等多种任务
 """
+import logging
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from modelscope.pipelines import pipeline
 from modelscope.utils.constant import Tasks
+from .pipeline_batch import apply_inference_precision, run_pipeline, run_pipeline_in_batches, DEFAULT_BATCH_SIZE
+
+logger = logging.getLogger("NER_API")
 
 
 class SiameseUIEModel:
@@ -46,11 +50,10 @@ class SiameseUIEModel:
                 model_revision='master'
             )
             print("模型加载成功！")
+            apply_inference_precision(self.pipeline)
         except Exception as e:
             error_msg = f"模型加载失败: {str(e)}"
-            print(f"错误详情: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("错误详情: %s", error_msg)
             raise Exception(error_msg)
     
     def extract_entities(self, text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
@@ -94,25 +97,63 @@ class SiameseUIEModel:
         
         try:
             # 按照README示例的方式调用pipeline
-            result = self.pipeline(input=text, schema=schema)
+            result = run_pipeline(self.pipeline, input=text, schema=schema)
             return {
                 "text": text,
                 "entities": result if result else {}
             }
         except Exception as e:
             error_msg = f"实体抽取出错: {str(e)}"
-            print(f"错误详情: {error_msg}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("错误详情: %s", error_msg)
             return {
                 "text": text,
                 "entities": {},
                 "error": error_msg
             }
     
+    def extract_entities_batch(self, texts: List[str], schema: Dict[str, Any], batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        批量抽取实体，多条文本分批一次性送入pipeline
+        
+        批量推理失败时自动退回逐条推理，返回格式与extract_entities一致。
+        
+        Args:
+            texts: 输入文本列表
+            schema: 实体抽取schema
+            batch_size: 每批文本数量
+            
+        Returns:
+            与texts一一对应的抽取结果列表
+        """
+        if not schema:
+            return [self.extract_entities(text, schema) for text in texts]
+        
+        # 空文本不参与推理
+        results = [{"text": text, "entities": {}} for text in texts]
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not indices:
+            return results
+        
+        try:
+            outputs = run_pipeline_in_batches(
+                self.pipeline, [texts[i] for i in indices], batch_size, schema=schema
+            )
+        except Exception as e:
+            logger.warning("批量推理失败，改为逐条推理: %s", e)
+            for i in indices:
+                results[i] = self.extract_entities(texts[i], schema)
+            return results
+        
+        for i, output in zip(indices, outputs):
+            results[i] = {
+                "text": texts[i],
+                "entities": output if output else {}
+            }
+        return results
+    
     def extract_from_files(self, files_content: Dict[str, str], schema: Dict[str, Any]) -> Dict[str, Any]:
         """
-        从多个文件内容中抽取实体
+        从多个文件内容中抽取实体（批量推理）
         
         Args:
             files_content: 文件内容字典，key为文件名，value为文件内容
@@ -121,9 +162,7 @@ class SiameseUIEModel:
         Returns:
             抽取结果字典，key为文件名，value为抽取结果
         """
-        results = {}
-        for filename, content in files_content.items():
-            print(f"正在处理文件: {filename}")
-            results[filename] = self.extract_entities(content, schema)
-        return results
+        print(f"正在批量处理 {len(files_content)} 个文件")
+        results = self.extract_entities_batch(list(files_content.values()), schema)
+        return dict(zip(files_content.keys(), results))
 
@@ -3,12 +3,44 @@
 根据数据库查询数据进行地址信息的补全
 """
 import os
+import time
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, List, Optional
+import pymysql
 from src.database import DatabaseConnection
+from src.utils.lru_cache import LRUCache
+from src.utils.batch_loader import BatchLoader
+from src.processors.region_index import Region, RegionIndex, region_from_row
 
 logger = logging.getLogger("NER_API")
 
+# 区域查询缓存条目数和过期时间（区域表很少变动，每个worker进程独立缓存，条目数设置为0可关闭缓存）
+REGION_CACHE_SIZE = int(os.getenv('REGION_CACHE_SIZE', '50000'))
+REGION_CACHE_TTL = float(os.getenv('REGION_CACHE_TTL', '0'))
+# 未查到记录（如错别字、非标准名称）的缓存条目数和缓存时间（秒），避免重复的错误输入反复查询数据库
+REGION_NEGATIVE_CACHE_SIZE = int(os.getenv('REGION_NEGATIVE_CACHE_SIZE', '10000'))
+REGION_NEGATIVE_CACHE_TTL = float(os.getenv('REGION_NEGATIVE_CACHE_TTL', '60'))
+
+# 地址补全结果缓存：按输入的省/市/区县/街道（街道为空时加上Address）缓存需要更新的字段
+REGION_RESULT_CACHE_SIZE = int(os.getenv('REGION_RESULT_CACHE_SIZE', '50000'))
+REGION_RESULT_CACHE_TTL = float(os.getenv('REGION_RESULT_CACHE_TTL', '300'))
+
+# 并发请求的起始区域查询合并：每批最多合并的区域数和等待窗口（毫秒）
+REGION_BATCH_SIZE = int(os.getenv('REGION_BATCH_SIZE', '128'))
+REGION_BATCH_WAIT_MS = float(os.getenv('REGION_BATCH_WAIT_MS', '5'))
+
+# 启动时把整张区域表加载到内存（设置为1开启），开启后地址补全不再查询数据库，加载失败时退回数据库查询
+REGION_PRELOAD = os.getenv('REGION_PRELOAD', '0') == '1'
+# 内存区域表的定时刷新间隔，单位秒（设置为0不刷新）
+REGION_REFRESH_INTERVAL = float(os.getenv('REGION_REFRESH_INTERVAL', '0'))
+
+# 父级链最多包含的层级数（街道->区县->市->省）
+MAX_PARENT_LEVELS = 4
+
+# 地址字段，按从高到低的层级排列
+_FIELD_ORDER = ('ProvinceName', 'CityName', 'ExpAreaName', 'StreetName')
+
 
 class AddressCompleter:
     """地址补全器"""
@@ -32,8 +64,247 @@ class AddressCompleter:
             'ExpAreaName': int(os.getenv('REGION_TYPE_EXP_AREA', '1003')),   # 区/县
             'StreetName': int(os.getenv('REGION_TYPE_STREET', '1004'))       # 街道/镇
         }
+        # 反向映射：区域类型 -> 字段名
+        self._type_to_field = {v: k for k, v in self.region_type_map.items()}
+        # 层级关系：区域类型 -> 父级区域类型（街道->区县->市->省，省无父级）
+        self._parent_type_map = {
+            self.region_type_map['StreetName']: self.region_type_map['ExpAreaName'],
+            self.region_type_map['ExpAreaName']: self.region_type_map['CityName'],
+            self.region_type_map['CityName']: self.region_type_map['ProvinceName'],
+            self.region_type_map['ProvinceName']: None
+        }
+        self._build_sql()
+        # 区域查询缓存：名称缓存键为 (region_type或0, 区域名称)，ID缓存键为 (region_type或0, 区域ID)
+        self._name_cache = LRUCache(maxsize=REGION_CACHE_SIZE, ttl=REGION_CACHE_TTL)
+        self._id_cache = LRUCache(maxsize=REGION_CACHE_SIZE, ttl=REGION_CACHE_TTL)
+        # 父级链缓存：键为起始区域ID，值为该区域及其所有上级区域
+        self._chain_cache = LRUCache(maxsize=REGION_CACHE_SIZE, ttl=REGION_CACHE_TTL)
+        # 未查到记录的缓存，与上面的缓存分开存放，避免大量错误输入挤掉常用区域
+        # 键为 (查询类型, *查询键)，查询类型为 name/id/chain/address
+        self._miss_cache = LRUCache(maxsize=REGION_NEGATIVE_CACHE_SIZE, ttl=REGION_NEGATIVE_CACHE_TTL)
+        # 地址补全结果缓存：值为需要更新的字段 {字段名: 补全后的值}
+        self._result_cache = LRUCache(maxsize=REGION_RESULT_CACHE_SIZE, ttl=REGION_RESULT_CACHE_TTL)
+        # 数据库是否支持递归查询（首次查询出现语法错误后置为False）
+        self._recursive_cte_supported = True
+        # 各线程当前这次地址补全中是否有区域查询出错（出错的查询按未找到处理，补全结果不写入缓存）
+        self._lookup_state = threading.local()
+        # 合并并发请求中缓存未命中的起始区域查询，键为 (region_type, 区域名称)
+        self._region_loader = BatchLoader(
+            self._load_chains_by_names,
+            max_batch_size=REGION_BATCH_SIZE,
+            max_wait=REGION_BATCH_WAIT_MS / 1000
+        )
+        # 区域表内存索引，为None时通过数据库查询
+        self._index: Optional[RegionIndex] = None
+        if REGION_PRELOAD:
+            self.load_region_index()
+            if REGION_REFRESH_INTERVAL > 0:
+                threading.Thread(target=self._refresh_region_index_loop,
+                                 name="region-index-refresh", daemon=True).start()
+    
+    def _build_sql(self):
+        """预先生成各查询的SQL语句（表名在初始化后不再变化），避免每次查询重复拼接"""
+        table = self.table_name
+        columns = "id, parent_id, region_name, region_type, alias_name"
+        # 递归查询中上一级区域必须是当前区域类型对应的父级类型（与逐级查询 find_parent_by_type_and_id 一致），
+        # 类型不符时父级链到此为止；省级等没有对应父级类型的区域不限制上一级的类型
+        parent_type_cases = " ".join(
+            f"WHEN {int(region_type)} THEN {int(parent_type)}"
+            for region_type, parent_type in self._parent_type_map.items() if parent_type
+        )
+        parent_type_check = f"r.region_type = COALESCE(CASE c.region_type {parent_type_cases} END, r.region_type)"
+        self._sql_by_type_and_name = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE region_type = %s AND region_name = %s AND is_deleted = 0
+            LIMIT 1
+        """
+        self._sql_by_name = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE region_name = %s AND is_deleted = 0
+            LIMIT 1
+        """
+        self._sql_by_id = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE id = %s AND is_deleted = 0
+            LIMIT 1
+        """
+        self._sql_by_type_and_id = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE region_type = %s AND id = %s AND is_deleted = 0
+            LIMIT 1
+        """
+        self._sql_by_type_and_alias = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE region_type = %s AND alias_name = %s AND is_deleted = 0
+            LIMIT 1
+        """
+        # 包含关系匹配（Address包含名称，或名称包含Address），优先名称包含Address的情况（更精确）
+        self._sql_name_contains = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE region_type = %s 
+              AND (region_name LIKE %s OR LOCATE(region_name, %s) > 0)
+              AND is_deleted = 0
+            ORDER BY 
+                CASE 
+                    WHEN region_name = %s THEN 1
+                    WHEN region_name LIKE %s THEN 2
+                    WHEN LOCATE(region_name, %s) > 0 THEN 3
+                    ELSE 4
+                END,
+                LENGTH(region_name) DESC
+            LIMIT 1
+        """
+        self._sql_alias_contains = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE region_type = %s 
+              AND alias_name IS NOT NULL 
+              AND alias_name != ''
+              AND (alias_name LIKE %s OR LOCATE(alias_name, %s) > 0)
+              AND is_deleted = 0
+            ORDER BY 
+                CASE 
+                    WHEN alias_name = %s THEN 1
+                    WHEN alias_name LIKE %s THEN 2
+                    WHEN LOCATE(alias_name, %s) > 0 THEN 3
+                    ELSE 4
+                END,
+                LENGTH(alias_name) DESC
+            LIMIT 1
+        """
+        self._sql_all_regions = f"""
+            SELECT {columns}
+            FROM {table}
+            WHERE is_deleted = 0
+            ORDER BY id
+        """
+        # 递归查询起始区域及其所有上级区域，参数为 (起始区域ID, 最大向上层数)
+        self._sql_ancestors = f"""
+            WITH RECURSIVE seed AS (
+                SELECT {columns}
+                FROM {table}
+                WHERE id = %s AND is_deleted = 0
+            ), chain AS (
+                SELECT {columns}, 0 AS depth
+                FROM seed
+                UNION ALL
+                SELECT r.id, r.parent_id, r.region_name, r.region_type, r.alias_name, c.depth + 1
+                FROM {table} r
+                JOIN chain c ON r.id = c.parent_id
+                WHERE r.is_deleted = 0 AND c.depth < %s AND {parent_type_check}
+            )
+            SELECT {columns}
+            FROM chain
+            ORDER BY depth
+        """
+        # 批量递归查询，{placeholders} 在查询时替换为与键数量相同的 (%s, %s) 列表
+        self._sql_chains_by_names = f"""
+            WITH RECURSIVE seed AS (
+                SELECT {columns}
+                FROM (
+                    SELECT {columns},
+                           ROW_NUMBER() OVER (PARTITION BY region_type, region_name ORDER BY id) AS rn
+                    FROM {table}
+                    WHERE (region_type, region_name) IN ({{placeholders}}) AND is_deleted = 0
+                ) matched
+                WHERE rn = 1
+            ), chain AS (
+                SELECT id AS seed_id, {columns}, 0 AS depth
+                FROM seed
+                UNION ALL
+                SELECT c.seed_id, r.id, r.parent_id, r.region_name, r.region_type, r.alias_name, c.depth + 1
+                FROM {table} r
+                JOIN chain c ON r.id = c.parent_id
+                WHERE r.is_deleted = 0 AND c.depth < %s AND {parent_type_check}
+            )
+            SELECT seed_id, {columns}
+            FROM chain
+            ORDER BY seed_id, depth
+        """
+    
+    def load_region_index(self) -> bool:
+        """
+        把区域表全部加载到内存索引中，加载完成后整体替换旧索引
+        
+        Returns:
+            是否加载成功，失败时保留原有索引（或继续使用数据库查询）
+        """
+        start_time = time.perf_counter()
+        try:
+            index = RegionIndex(self.db.execute_query(self._sql_all_regions), self._parent_type_map)
+        except Exception as e:
+            logger.warning("加载区域表到内存失败，继续使用数据库查询: %s", e)
+            return False
+        
+        self._index = index
+        logger.info("区域表已加载到内存: %d 条记录，耗时 %.2f 秒", len(index), time.perf_counter() - start_time)
+        return True
+    
+    def _refresh_region_index_loop(self):
+        """按 REGION_REFRESH_INTERVAL 定时重新加载区域表"""
+        while True:
+            time.sleep(REGION_REFRESH_INTERVAL)
+            self.load_region_index()
+    
+    def _is_known_miss(self, kind: str, key: tuple) -> bool:
+        """最近是否已查询过且数据库中无此记录"""
+        return self._miss_cache.get((kind,) + key) is not None
+    
+    def _remember_miss(self, kind: str, key: tuple):
+        """记录数据库中无此记录，在 REGION_NEGATIVE_CACHE_TTL 秒内不再查询"""
+        self._miss_cache.set((kind,) + key, True)
     
-    def find_region_by_name(self, region_name: str, region_type: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    def _mark_lookup_failed(self):
+        """记录当前线程的这次地址补全中有区域查询出错，避免把数据库暂时不可用时的结果当作“无需补全”缓存下来"""
+        self._lookup_state.failed = True
+    
+    def _cached_query(self, cache: LRUCache, kind: str, key: tuple, sql: str, params: tuple) -> Optional[Region]:
+        """
+        带缓存的单行查询，查询结果为空时记入未查到记录的缓存
+        
+        查询出错时异常直接抛出，不写入缓存
+        
+        Args:
+            cache: 使用的缓存
+            kind: 查询类型（name/id），用于区分未查到记录缓存中的键
+            key: 缓存键
+            sql: SQL语句
+            params: SQL参数
+            
+        Returns:
+            区域信息，数据库中无此记录时返回None
+        """
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        if self._is_known_miss(kind, key):
+            return None
+        
+        result = region_from_row(self.db.execute_one(sql, params))
+        if result:
+            cache.set(key, result)
+        else:
+            self._remember_miss(kind, key)
+        return result
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """获取区域查询缓存统计信息"""
+        return {
+            "name": self._name_cache.stats(),
+            "id": self._id_cache.stats(),
+            "chain": self._chain_cache.stats(),
+            "negative": self._miss_cache.stats(),
+            "result": self._result_cache.stats(),
+            "preloaded_regions": len(self._index) if self._index is not None else None
+        }
+    
+    def find_region_by_name(self, region_name: str, region_type: Optional[int] = None) -> Optional[Region]:
         """
         根据区域名称查找区域信息
         
@@ -42,38 +313,33 @@ class AddressCompleter:
             region_type: 区域类型（可选，用于精确匹配）
             
         Returns:
-            区域信息字典，包含id, parent_id, region_name, region_type等字段
+            区域信息（Region），包含id, parent_id, region_name, region_type, alias_name字段
         """
         if not region_name or not region_name.strip():
             return None
         
+        region_name = region_name.strip()
+        if self._index is not None:
+            return self._index.find_by_name(region_name, region_type)
+        
         try:
             if region_type:
                 # 优化查询：先按region_type筛选（可以利用索引），再按region_name精确匹配
                 # 这样可以先利用region_type的索引缩小范围，再精确匹配region_name，提高查询效率
-                sql = f"""
-                    SELECT id, parent_id, region_name, region_type, alias_name
-                    FROM {self.table_name}
-                    WHERE region_type = %s AND region_name = %s AND is_deleted = 0
-                    LIMIT 1
-                """
-                result = self.db.execute_one(sql, (region_type, region_name.strip()))
+                result = self._cached_query(self._name_cache, 'name', (region_type, region_name),
+                                            self._sql_by_type_and_name, (region_type, region_name))
             else:
                 # 仅匹配名称
-                sql = f"""
-                    SELECT id, parent_id, region_name, region_type, alias_name
-                    FROM {self.table_name}
-                    WHERE region_name = %s AND is_deleted = 0
-                    LIMIT 1
-                """
-                result = self.db.execute_one(sql, (region_name.strip(),))
+                result = self._cached_query(self._name_cache, 'name', (0, region_name),
+                                            self._sql_by_name, (region_name,))
             
             return result
         except Exception as e:
-            logger.error(f"查找区域信息失败: {str(e)}, region_name={region_name}, region_type={region_type}")
+            logger.error("查找区域信息失败: %s, region_name=%s, region_type=%s", e, region_name, region_type)
+            self._mark_lookup_failed()
             return None
     
-    def find_region_by_id(self, region_id: int) -> Optional[Dict[str, Any]]:
+    def find_region_by_id(self, region_id: int) -> Optional[Region]:
         """
         根据区域ID查找区域信息
         
@@ -86,20 +352,18 @@ class AddressCompleter:
         if not region_id:
             return None
         
+        if self._index is not None:
+            return self._index.find_by_id(region_id)
+        
         try:
-            sql = f"""
-                SELECT id, parent_id, region_name, region_type, alias_name
-                FROM {self.table_name}
-                WHERE id = %s AND is_deleted = 0
-                LIMIT 1
-            """
-            result = self.db.execute_one(sql, (region_id,))
+            result = self._cached_query(self._id_cache, 'id', (0, region_id), self._sql_by_id, (region_id,))
             return result
         except Exception as e:
-            logger.error(f"根据ID查找区域信息失败: {str(e)}, region_id={region_id}")
+            logger.error("根据ID查找区域信息失败: %s, region_id=%s", e, region_id)
+            self._mark_lookup_failed()
             return None
     
-    def find_parent_by_type_and_id(self, parent_region_type: int, parent_id: int) -> Optional[Dict[str, Any]]:
+    def find_parent_by_type_and_id(self, parent_region_type: int, parent_id: int) -> Optional[Region]:
         """
         根据父级区域类型和父级ID查找父级区域信息（优化查询）
         
@@ -119,22 +383,22 @@ class AddressCompleter:
         if not parent_region_type or not parent_id:
             return None
         
+        if self._index is not None:
+            return self._index.find_by_id(parent_id, parent_region_type)
+        
         try:
             # 优化查询：先按region_type筛选，再按id匹配
             # 这样可以利用region_type的索引，减少扫描记录数
-            sql = f"""
-                SELECT id, parent_id, region_name, region_type, alias_name
-                FROM {self.table_name}
-                WHERE region_type = %s AND id = %s AND is_deleted = 0
-                LIMIT 1
-            """
-            result = self.db.execute_one(sql, (parent_region_type, parent_id))
+            result = self._cached_query(self._id_cache, 'id', (parent_region_type, parent_id),
+                                        self._sql_by_type_and_id, (parent_region_type, parent_id))
             return result
         except Exception as e:
-            logger.error(f"根据类型和ID查找父级区域失败: {str(e)}, parent_region_type={parent_region_type}, parent_id={parent_id}")
+            logger.error("根据类型和ID查找父级区域失败: %s, parent_region_type=%s, parent_id=%s",
+                         e, parent_region_type, parent_id)
+            self._mark_lookup_failed()
             return None
     
-    def find_region_by_address_and_type(self, address_text: str, region_type: int) -> Optional[Dict[str, Any]]:
+    def find_region_by_address_and_type(self, address_text: str, region_type: int) -> Optional[Region]:
         """
         根据Address字段和region_type查找匹配的区域信息
         
@@ -156,87 +420,51 @@ class AddressCompleter:
         if not region_type:
             return None
         
+        address_text = address_text.strip()
+        if self._index is not None:
+            return self._index.find_by_address(address_text, region_type)
+        if self._is_known_miss('address', (region_type, address_text)):
+            return None
+        
         try:
-            address_text = address_text.strip()
-            
             # 策略1：先匹配region_name字段（相等或包含关系）
             # 相等匹配
-            sql = f"""
-                SELECT id, parent_id, region_name, region_type, alias_name
-                FROM {self.table_name}
-                WHERE region_type = %s AND region_name = %s AND is_deleted = 0
-                LIMIT 1
-            """
-            result = self.db.execute_one(sql, (region_type, address_text))
+            result = region_from_row(self.db.execute_one(self._sql_by_type_and_name, (region_type, address_text)))
             if result:
-                logger.info(f"通过Address精确匹配region_name找到记录: {result.get('region_name')}")
+                logger.info("通过Address精确匹配region_name找到记录: %s", result.region_name)
                 return result
             
             # 包含关系匹配（Address包含region_name，或region_name包含Address）
             # 优先匹配region_name包含Address的情况（更精确）
             pattern = f"%{address_text}%"
-            sql = f"""
-                SELECT id, parent_id, region_name, region_type, alias_name
-                FROM {self.table_name}
-                WHERE region_type = %s 
-                  AND (region_name LIKE %s OR LOCATE(region_name, %s) > 0)
-                  AND is_deleted = 0
-                ORDER BY 
-                    CASE 
-                        WHEN region_name = %s THEN 1
-                        WHEN region_name LIKE %s THEN 2
-                        WHEN LOCATE(region_name, %s) > 0 THEN 3
-                        ELSE 4
-                    END,
-                    LENGTH(region_name) DESC
-                LIMIT 1
-            """
-            result = self.db.execute_one(sql, (region_type, pattern, address_text, address_text, pattern, address_text))
+            result = region_from_row(self.db.execute_one(
+                self._sql_name_contains, (region_type, pattern, address_text, address_text, pattern, address_text)
+            ))
             if result:
-                logger.info(f"通过Address包含匹配region_name找到记录: {result.get('region_name')}")
+                logger.info("通过Address包含匹配region_name找到记录: %s", result.region_name)
                 return result
             
             # 策略2：如果region_name未匹配成功，尝试匹配alias_name字段
             # 相等匹配
-            sql = f"""
-                SELECT id, parent_id, region_name, region_type, alias_name
-                FROM {self.table_name}
-                WHERE region_type = %s AND alias_name = %s AND is_deleted = 0
-                LIMIT 1
-            """
-            result = self.db.execute_one(sql, (region_type, address_text))
+            result = region_from_row(self.db.execute_one(self._sql_by_type_and_alias, (region_type, address_text)))
             if result:
-                logger.info(f"通过Address精确匹配alias_name找到记录: {result.get('region_name')}, alias={result.get('alias_name')}")
+                logger.info("通过Address精确匹配alias_name找到记录: %s, alias=%s", result.region_name, result.alias_name)
                 return result
             
             # 包含关系匹配alias_name
-            pattern = f"%{address_text}%"
-            sql = f"""
-                SELECT id, parent_id, region_name, region_type, alias_name
-                FROM {self.table_name}
-                WHERE region_type = %s 
-                  AND alias_name IS NOT NULL 
-                  AND alias_name != ''
-                  AND (alias_name LIKE %s OR LOCATE(alias_name, %s) > 0)
-                  AND is_deleted = 0
-                ORDER BY 
-                    CASE 
-                        WHEN alias_name = %s THEN 1
-                        WHEN alias_name LIKE %s THEN 2
-                        WHEN LOCATE(alias_name, %s) > 0 THEN 3
-                        ELSE 4
-                    END,
-                    LENGTH(alias_name) DESC
-                LIMIT 1
-            """
-            result = self.db.execute_one(sql, (region_type, pattern, address_text, address_text, pattern, address_text))
+            result = region_from_row(self.db.execute_one(
+                self._sql_alias_contains, (region_type, pattern, address_text, address_text, pattern, address_text)
+            ))
             if result:
-                logger.info(f"通过Address包含匹配alias_name找到记录: {result.get('region_name')}, alias={result.get('alias_name')}")
+                logger.info("通过Address包含匹配alias_name找到记录: %s, alias=%s", result.region_name, result.alias_name)
                 return result
             
+            self._remember_miss('address', (region_type, address_text))
             return None
         except Exception as e:
-            logger.error(f"根据Address和region_type查找区域信息失败: {str(e)}, address_text={address_text}, region_type={region_type}")
+            logger.error("根据Address和region_type查找区域信息失败: %s, address_text=%s, region_type=%s",
+                         e, address_text, region_type)
+            self._mark_lookup_failed()
             return None
     
     def get_parent_region_type(self, current_region_type: int) -> Optional[int]:
@@ -249,22 +477,215 @@ class AddressCompleter:
         Returns:
             父级区域类型，如果已经是最高级则返回None
         """
-        # 根据层级关系推断父级类型
-        if current_region_type == self.region_type_map.get('StreetName'):  # 街道(1004) -> 区县(1003)
-            return self.region_type_map.get('ExpAreaName')
-        elif current_region_type == self.region_type_map.get('ExpAreaName'):  # 区县(1003) -> 市(1002)
-            return self.region_type_map.get('CityName')
-        elif current_region_type == self.region_type_map.get('CityName'):  # 市(1002) -> 省(1001)
-            return self.region_type_map.get('ProvinceName')
-        elif current_region_type == self.region_type_map.get('ProvinceName'):  # 省(1001) -> 无父级
+        # 未知类型同样返回None
+        return self._parent_type_map.get(current_region_type)
+    
+    def _query_chain(self, region_id: int) -> Optional[List[Region]]:
+        """
+        使用递归查询（WITH RECURSIVE，需要MySQL 8.0+）一次取出起始区域及其所有上级区域
+        
+        Args:
+            region_id: 起始区域ID
+            
+        Returns:
+            按层级从低到高排列的区域信息列表（第一条为起始区域自身），未找到起始区域时为空列表；
+            数据库不支持递归查询或查询失败时返回None
+        """
+        if not self._recursive_cte_supported:
             return None
-        else:
-            # 未知类型，返回None
+        
+        try:
+            rows = self.db.execute_query(self._sql_ancestors, (region_id, MAX_PARENT_LEVELS - 1))
+            return [region_from_row(row) for row in rows]
+        except pymysql.err.ProgrammingError as e:
+            # MySQL 5.7及以下不支持WITH RECURSIVE，之后不再尝试
+            self._recursive_cte_supported = False
+            logger.warning("数据库不支持递归查询，父级链改为逐级查询: %s", e)
+        except Exception as e:
+            logger.error("递归查询父级链失败: %s, region_id=%s", e, region_id)
+            self._mark_lookup_failed()
+        return None
+    
+    def find_ancestors(self, region_id: int) -> Optional[List[Region]]:
+        """
+        一次查询取出区域自身及其所有上级区域
+        
+        Args:
+            region_id: 起始区域ID
+            
+        Returns:
+            按层级从低到高排列的区域信息列表（第一条为起始区域自身）；
+            数据库不支持递归查询或查询失败时返回None，由调用方改为逐级查询
+        """
+        if not region_id:
+            return None
+        
+        if self._index is not None:
+            return self._index.ancestors_by_id(region_id, MAX_PARENT_LEVELS)
+        
+        cached = self._chain_cache.get(region_id)
+        if cached is not None:
+            return cached
+        if self._is_known_miss('chain', (region_id,)):
+            return []
+        
+        rows = self._query_chain(region_id)
+        if rows:
+            self._chain_cache.set(region_id, rows)
+        elif rows is not None:
+            self._remember_miss('chain', (region_id,))
+        return rows
+    
+    def _load_chains_by_names(self, keys: List[tuple]) -> Dict[tuple, List[Region]]:
+        """
+        批量查找起始区域，并在同一次递归查询中取出它们各自的所有上级区域
+        
+        同名同类型的区域有多条时取ID最小的一条
+        
+        Args:
+            keys: (region_type, 区域名称) 列表
+            
+        Returns:
+            {(region_type, 区域名称): 按层级从低到高排列的区域信息列表}，未找到的键对应空列表；
+            数据库不支持递归查询或查询失败时返回空字典
+        """
+        if not self._recursive_cte_supported:
+            return {}
+        
+        placeholders = ", ".join(["(%s, %s)"] * len(keys))
+        sql = self._sql_chains_by_names.replace("{placeholders}", placeholders)
+        params = tuple(value for key in keys for value in key) + (MAX_PARENT_LEVELS - 1,)
+        try:
+            rows = self.db.execute_query(sql, params)
+        except pymysql.err.ProgrammingError as e:
+            # MySQL 5.7及以下不支持WITH RECURSIVE，之后不再尝试
+            self._recursive_cte_supported = False
+            logger.warning("数据库不支持递归查询，父级链改为逐级查询: %s", e)
+            return {}
+        except Exception as e:
+            logger.error("批量递归查询父级链失败: %s, keys=%s", e, keys)
+            self._mark_lookup_failed()
+            return {}
+        
+        # 按起始区域分组，数据库比较名称时忽略大小写和尾部空格，这里同样按小写匹配回请求的键
+        chains: Dict[Any, List[Region]] = {}
+        for row in rows:
+            chains.setdefault(row['seed_id'], []).append(region_from_row(row))
+        by_name = {
+            (chain[0].region_type, str(chain[0].region_name).strip().lower()): chain
+            for chain in chains.values()
+        }
+        return {key: by_name.get((key[0], key[1].lower()), []) for key in keys}
+    
+    def resolve_and_chain(self, region_name: str, region_type: int) -> Optional[List[Region]]:
+        """
+        根据区域名称和类型查找起始区域，并在同一次查询中取出其所有上级区域
+        
+        缓存未命中时，并发请求的查询会在短时间窗口内合并为一次批量查询
+        
+        Args:
+            region_name: 区域名称
+            region_type: 区域类型
+            
+        Returns:
+            按层级从低到高排列的区域信息列表（第一条为起始区域自身），未找到时为空列表；
+            数据库不支持递归查询或查询失败时返回None，由调用方改为逐级查询
+        """
+        region_name = region_name.strip()
+        if self._index is not None:
+            return self._index.ancestors_by_name(region_name, region_type, MAX_PARENT_LEVELS)
+        
+        key = (region_type, region_name)
+        cached = self._name_cache.get(key)
+        if cached is not None:
+            return self.find_ancestors(cached.id)
+        if self._is_known_miss('name', key):
+            return []
+        
+        if not self._recursive_cte_supported:
             return None
+        rows = self._region_loader.load(key)
+        if rows:
+            self._name_cache.set(key, rows[0])
+            self._chain_cache.set(rows[0].id, rows)
+        elif rows is not None:
+            self._remember_miss('name', key)
+        return rows
+    
+    def _add_to_chain(self, chain: Dict[str, Dict[str, Any]], region: Region):
+        """
+        根据区域类型把区域信息（region_name和alias_name）记录到父级链中
+        
+        Args:
+            chain: 父级链字典
+            region: 区域信息
+        """
+        field = self._type_to_field.get(region.region_type)
+        if not field:
+            return
+        
+        region_name = region.region_name or ''
+        
+        # 记录完整信息（包括region_name和alias_name），同时保存标准化后的名称，比较时无需重复处理
+        # alias_name 可能是 None、空字符串或其他类型，直接保存标准化后的值
+        chain[field] = {
+            'region_name': region_name,
+            'alias_name': self._normalize_region_name(region.alias_name),
+            '_norm_name': self._normalize_region_name(region_name)
+        }
+    
+    def get_parent_chain(self, start_region: Region) -> Dict[str, Dict[str, Any]]:
+        """
+        获取父级链，从当前区域向上查找所有父级
+        
+        优先使用递归查询一次取出整条父级链；数据库不支持递归查询时退回逐级查询
+        
+        Args:
+            start_region: 起始区域信息（包含id, parent_id, region_name, region_type等）
+            
+        Returns:
+            包含所有父级信息的字典，键为区域类型名称（ProvinceName, CityName, ExpAreaName, StreetName）
+            值为包含 region_name 和 alias_name 的字典
+        """
+        ancestors = self.find_ancestors(start_region.id)
+        if ancestors is None:
+            return self._walk_parent_chain(start_region)
+        return self._build_chain(ancestors)
     
-    def get_parent_chain(self, start_region: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    def _build_chain(self, ancestors: List[Region]) -> Dict[str, Dict[str, Any]]:
         """
-        获取父级链，从当前区域向上查找所有父级（优化版本）
+        把递归查询得到的区域列表整理为父级链字典
+        
+        Args:
+            ancestors: 按层级从低到高排列的区域信息列表
+            
+        Returns:
+            与 get_parent_chain 格式一致的父级链字典
+        """
+        chain = {}
+        for region in ancestors:
+            self._add_to_chain(chain, region)
+        return chain
+    
+    def _resolve_start_region(self, region_name: str, region_type: int):
+        """
+        查找起始区域，优先通过一次递归查询同时取出其父级链
+        
+        Args:
+            region_name: 区域名称
+            region_type: 区域类型
+            
+        Returns:
+            (起始区域信息, 父级区域列表)，不支持递归查询时父级区域列表为None
+        """
+        ancestors = self.resolve_and_chain(region_name, region_type)
+        if ancestors is None:
+            return self.find_region_by_name(region_name, region_type), None
+        return (ancestors[0] if ancestors else None), ancestors
+    
+    def _walk_parent_chain(self, start_region: Region) -> Dict[str, Dict[str, Any]]:
+        """
+        逐级查询父级链（不支持递归查询时使用）
         
         优化逻辑：
         1. 先根据region_type进行粗筛选（可以利用索引）
@@ -275,44 +696,17 @@ class AddressCompleter:
             start_region: 起始区域信息（包含id, parent_id, region_name, region_type等）
             
         Returns:
-            包含所有父级信息的字典，键为区域类型名称（ProvinceName, CityName, ExpAreaName, StreetName）
-            值为包含 region_name 和 alias_name 的字典
+            与 get_parent_chain 格式一致的父级链字典
         """
         chain = {}
         current = start_region
-        
-        # 最多向上查找4级（街道->区县->市->省）
-        max_levels = 4
         level = 0
         
-        while current and level < max_levels:
-            region_type = current.get('region_type')
-            region_name = current.get('region_name')
-            alias_name = current.get('alias_name')  # 可能是 None、空字符串或其他类型
-            parent_id = current.get('parent_id')
-            
-            # 标准化 alias_name：处理 None、空字符串、非字符串类型等情况
-            normalized_alias = ''
-            if alias_name:
-                try:
-                    normalized_alias = str(alias_name).strip()
-                except Exception:
-                    normalized_alias = ''
-            
-            # 根据region_type确定字段名并记录完整信息（包括region_name和alias_name）
-            region_info = {
-                'region_name': region_name or '',
-                'alias_name': normalized_alias
-            }
-            
-            if region_type == self.region_type_map.get('StreetName'):
-                chain['StreetName'] = region_info
-            elif region_type == self.region_type_map.get('ExpAreaName'):
-                chain['ExpAreaName'] = region_info
-            elif region_type == self.region_type_map.get('CityName'):
-                chain['CityName'] = region_info
-            elif region_type == self.region_type_map.get('ProvinceName'):
-                chain['ProvinceName'] = region_info
+        # 最多向上查找4级（街道->区县->市->省）
+        while current and level < MAX_PARENT_LEVELS:
+            self._add_to_chain(chain, current)
+            region_type = current.region_type
+            parent_id = current.parent_id
             
             # 如果没有父级ID，说明已经到顶了
             if not parent_id:
@@ -345,80 +739,9 @@ class AddressCompleter:
         if not name:
             return ""
         # 转换为字符串，处理非字符串类型（如数字）
-        try:
-            return str(name).strip()
-        except Exception:
-            return ""
-    
-    def _is_region_name_equal(self, name1: str, name2: str) -> bool:
-        """
-        比较两个区域名称是否相等（忽略空格和大小写）
-        
-        Args:
-            name1: 第一个区域名称
-            name2: 第二个区域名称
-            
-        Returns:
-            是否相等
-        """
-        return self._normalize_region_name(name1) == self._normalize_region_name(name2)
+        return str(name).strip()
     
-    def _update_field_if_needed(self, result: Dict[str, Any], field_name: str, 
-                                parent_chain: Dict[str, Dict[str, Any]]) -> bool:
-        """
-        更新字段值（如果字段为空或与数据库值不一致）
-        
-        替换逻辑：
-        1. 如果字段为空，则补全
-        2. 如果字段有值，先与 region_name 对比
-        3. 如果与 region_name 不一致，再与 alias_name 对比
-        4. 如果与 alias_name 一致，则保留原有值
-        5. 如果与 alias_name 也不一致，则用 region_name 替换
-        
-        Args:
-            result: 结果字典
-            field_name: 字段名
-            parent_chain: 父级链字典（包含从数据库查找到的值，每个值是一个包含 region_name 和 alias_name 的字典）
-            
-        Returns:
-            是否进行了更新
-        """
-        if field_name not in parent_chain:
-            return False
-        
-        region_info = parent_chain[field_name]
-        db_region_name = region_info.get('region_name', '')
-        db_alias_name = region_info.get('alias_name', '')
-        current_value = result.get(field_name, "").strip() if result.get(field_name) else ""
-        
-        # 如果字段为空，则补全
-        if not current_value:
-            result[field_name] = db_region_name
-            logger.info(f"补全{field_name}: {db_region_name}")
-            return True
-        
-        # 如果字段有值，先与 region_name 对比
-        if self._is_region_name_equal(current_value, db_region_name):
-            # 与 region_name 一致，无需更新
-            return False
-        
-        # 与 region_name 不一致，再与 alias_name 对比（如果别名存在且非空）
-        if db_alias_name and db_alias_name.strip():
-            if self._is_region_name_equal(current_value, db_alias_name):
-                # 与 alias_name 一致，保留原有值
-                logger.debug(f"保留{field_name}: '{current_value}' (与别名 '{db_alias_name}' 一致)")
-                return False
-        
-        # 与 region_name 和 alias_name 都不一致（或别名不存在），用 region_name 替换
-        old_value = current_value
-        result[field_name] = db_region_name
-        if db_alias_name and db_alias_name.strip():
-            logger.info(f"替换{field_name}: '{old_value}' -> '{db_region_name}' (别名: '{db_alias_name}')")
-        else:
-            logger.info(f"替换{field_name}: '{old_value}' -> '{db_region_name}'")
-        return True
-    
-    def complete_address(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def complete_address(self, data: Dict[str, Any], *, inplace: bool = False) -> Dict[str, Any]:
         """
         补全地址信息
         
@@ -437,29 +760,44 @@ class AddressCompleter:
         
         Args:
             data: 模型返回的数据字典，包含ProvinceName, CityName, ExpAreaName, StreetName等字段
+            inplace: 是否直接修改data（调用方确认data不会被其他地方使用时可开启，省去一次复制）
             
         Returns:
             补全后的数据字典
         """
-        result = data.copy()
+        result = data if inplace else data.copy()
+        
+        # 入口处统一标准化各地址字段，后续不再重复处理
+        # Address只在StreetName为空时参与查找
+        norm = {field_name: self._normalize_region_name(data.get(field_name)) for field_name in _FIELD_ORDER}
+        address_text = '' if norm['StreetName'] else self._normalize_region_name(data.get('Address'))
+        
+        # 相同的输入地址直接使用缓存的补全结果（补全结果只取决于各地址字段和上面的Address）
+        cache_key = tuple(norm.values()) + (address_text,)
+        updates = self._result_cache.get(cache_key)
+        if updates is not None:
+            result.update(updates)
+            return result
         
+        self._lookup_state.failed = False
         try:
             # 确定起始查找点
             start_field = None
             start_value = None
             start_type = None
             start_region = None
+            # 起始区域及其父级区域（通过递归查询一次取出时有值）
+            ancestors = None
             
             # 按优先级查找起始点
-            if data.get('StreetName') and data.get('StreetName').strip():
+            if norm['StreetName']:
                 start_field = 'StreetName'
-                start_value = data.get('StreetName')
-                start_type = self.region_type_map.get('StreetName')
+                start_value = norm['StreetName']
+                start_type = self.region_type_map['StreetName']
                 # 查找起始区域
-                start_region = self.find_region_by_name(start_value, start_type)
-            elif data.get('Address') and data.get('Address').strip():
+                start_region, ancestors = self._resolve_start_region(start_value, start_type)
+            elif address_text:
                 # StreetName为空时，尝试从Address字段查找
-                address_text = data.get('Address').strip()
                 street_region_type = self.region_type_map.get('StreetName')  # 1004
                 
                 # 使用region_type=1004进行粗筛，再用Address匹配region_name或alias_name
@@ -468,57 +806,91 @@ class AddressCompleter:
                 if start_region:
                     # 找到了匹配的记录，从此条记录开始向上查找
                     start_field = 'StreetName'
-                    start_value = start_region.get('region_name', '')
+                    start_value = start_region.region_name or ''
                     start_type = street_region_type
-                    logger.info(f"通过Address字段找到匹配的街道记录: {start_value}")
+                    logger.info("通过Address字段找到匹配的街道记录: %s", start_value)
                 else:
                     # 未找到匹配记录，跳过，继续执行从ExpAreaName开始向上查找
-                    logger.debug(f"通过Address字段未找到匹配的街道记录，继续从ExpAreaName查找")
+                    logger.debug("通过Address字段未找到匹配的街道记录，继续从ExpAreaName查找")
             
             # 如果通过Address未找到，或者Address为空，继续按原有逻辑查找
+            # 依次尝试ExpAreaName、CityName、ProvinceName中第一个非空的字段
             if not start_region:
-                if data.get('ExpAreaName') and data.get('ExpAreaName').strip():
-                    start_field = 'ExpAreaName'
-                    start_value = data.get('ExpAreaName')
-                    start_type = self.region_type_map.get('ExpAreaName')
-                    start_region = self.find_region_by_name(start_value, start_type)
-                elif data.get('CityName') and data.get('CityName').strip():
-                    start_field = 'CityName'
-                    start_value = data.get('CityName')
-                    start_type = self.region_type_map.get('CityName')
-                    start_region = self.find_region_by_name(start_value, start_type)
-                elif data.get('ProvinceName') and data.get('ProvinceName').strip():
-                    start_field = 'ProvinceName'
-                    start_value = data.get('ProvinceName')
-                    start_type = self.region_type_map.get('ProvinceName')
-                    start_region = self.find_region_by_name(start_value, start_type)
+                for field_name in ('ExpAreaName', 'CityName', 'ProvinceName'):
+                    if norm[field_name]:
+                        start_field = field_name
+                        start_value = norm[field_name]
+                        start_type = self.region_type_map[field_name]
+                        start_region, ancestors = self._resolve_start_region(start_value, start_type)
+                        break
             
             if not start_region:
-                logger.warning(f"未在数据库中找到匹配的区域: start_field={start_field}, start_value={start_value}")
+                logger.warning("未在数据库中找到匹配的区域: start_field=%s, start_value=%s", start_field, start_value)
+                # 只有查询确实执行且没有结果时才缓存；查询出错时下次重新查询
+                if not self._lookup_state.failed:
+                    self._result_cache.set(cache_key, {}, ttl=REGION_NEGATIVE_CACHE_TTL)
                 return result
             
             # 获取父级链
-            parent_chain = self.get_parent_chain(start_region)
+            if ancestors:
+                parent_chain = self._build_chain(ancestors)
+            else:
+                parent_chain = self.get_parent_chain(start_region)
             
             # 补全和验证替换字段（按从高到低的层级顺序）
             # 这样如果上级字段被替换，下级字段也会基于正确的上级进行验证
-            self._update_field_if_needed(result, 'ProvinceName', parent_chain)
-            self._update_field_if_needed(result, 'CityName', parent_chain)
-            self._update_field_if_needed(result, 'ExpAreaName', parent_chain)
-            self._update_field_if_needed(result, 'StreetName', parent_chain)
+            # 替换逻辑：
+            # 1. 如果字段为空，则补全
+            # 2. 如果字段有值，先与 region_name 对比，一致则无需更新
+            # 3. 如果与 region_name 不一致，再与 alias_name 对比，一致则保留原有值
+            # 4. 如果与 alias_name 也不一致（或别名不存在），则用 region_name 替换
+            updates = {}
+            # 日志级别关闭时跳过日志参数的格式化
+            log_info = logger.isEnabledFor(logging.INFO)
+            for field_name in _FIELD_ORDER:
+                region_info = parent_chain.get(field_name)
+                if region_info is None:
+                    continue
+                
+                db_region_name = region_info['region_name']
+                db_alias_name = region_info['alias_name']
+                current_value = norm[field_name]
+                
+                if not current_value:
+                    if log_info:
+                        logger.info("补全%s: %s", field_name, db_region_name)
+                elif current_value == region_info['_norm_name']:
+                    continue
+                elif db_alias_name and current_value == db_alias_name:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("保留%s: '%s' (与别名 '%s' 一致)", field_name, current_value, db_alias_name)
+                    continue
+                elif log_info:
+                    if db_alias_name:
+                        logger.info("替换%s: '%s' -> '%s' (别名: '%s')",
+                                    field_name, current_value, db_region_name, db_alias_name)
+                    else:
+                        logger.info("替换%s: '%s' -> '%s'", field_name, current_value, db_region_name)
+                
+                result[field_name] = db_region_name
+                updates[field_name] = db_region_name
+            # 父级链查询出错时补全结果可能不完整，不缓存
+            if not self._lookup_state.failed:
+                self._result_cache.set(cache_key, updates)
             
         except Exception as e:
-            logger.error(f"地址补全失败: {str(e)}")
+            logger.error("地址补全失败: %s", e)
             # 发生错误时返回原始数据，不中断流程
         
         return result
     
-    def complete_extract_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+    def complete_extract_response(self, response: Dict[str, Any], *, inplace: bool = False) -> Dict[str, Any]:
         """
         补全ExtractResponse格式的响应数据
         
         Args:
             response: ExtractResponse格式的响应字典，包含Data字段
+            inplace: 是否直接修改response及其Data字段（调用方确认response是新建的、不会被其他地方使用时可开启）
             
         Returns:
             补全后的响应字典
@@ -527,10 +899,10 @@ class AddressCompleter:
             return response
         
         # 补全Data字段中的地址信息
-        completed_data = self.complete_address(response['Data'])
+        completed_data = self.complete_address(response['Data'], inplace=inplace)
         
-        # 创建新的响应对象
-        result = response.copy()
+        # 非原地修改时创建新的响应对象
+        result = response if inplace else response.copy()
         result['Data'] = completed_data
         
         return result
@@ -2,6 +2,8 @@
 格式转换工具函数
 用于将不同模型的返回结果转换为统一格式
 """
+import re
+from operator import itemgetter
 from typing import Dict, Any, Optional, List
 from src.config.constants import (
     DEFAULT_EBUSINESS_ID, DEFAULT_SUCCESS_CODE, DEFAULT_ERROR_CODE,
@@ -13,6 +15,71 @@ from src.config.constants import (
 from src.utils.address_parser import AddressParser
 from src.utils.entity_extractor import EntityExtractor
 
+# 预编译的正则表达式，避免每次调用时重复解析
+_PHONE_RE = re.compile(PHONE_PATTERN)
+_NAME_RE = re.compile(CHINESE_NAME_PATTERN)
+
+# 地址类实体类型，查找姓名时需要跳过这些实体所在的位置
+_ADDRESS_ENTITY_TYPES = frozenset({
+    ENTITY_TYPE_PROVINCE, ENTITY_TYPE_CITY, ENTITY_TYPE_DISTRICT,
+    ENTITY_TYPE_STREET, ENTITY_TYPE_ROAD, ENTITY_TYPE_UNIT_ADDRESS,
+    ENTITY_TYPE_NUMBER_ENG
+})
+
+_start_key = itemgetter("start")
+
+# 结果中Data字段的默认值
+_DEFAULT_DATA_TEMPLATE = {
+    "ProvinceName": "",
+    "StreetName": "",
+    "Address": "",
+    "CityName": "",
+    "ExpAreaName": "",
+    "Mobile": "",
+    "Name": ""
+}
+
+# 分类后的实体类别 -> 地址字段
+_CLASSIFIED_FIELDS = (
+    ("province", "ProvinceName"),
+    ("city", "CityName"),
+    ("district", "ExpAreaName"),
+    ("street", "StreetName"),
+)
+
+# parse_chinese_address 结果的键 -> 地址字段
+_PARSED_FIELDS = (
+    ("province", "ProvinceName"),
+    ("city", "CityName"),
+    ("district", "ExpAreaName"),
+    ("street", "StreetName"),
+    ("address", "Address"),
+)
+
+# mgeo_geographic_elements_tagging_chinese_base 模型：实体类型 -> 地址字段
+_MGEO_TAGGING_FIELDS = {
+    "prov": "ProvinceName",
+    "city": "CityName",
+    "district": "ExpAreaName",
+    "town": "StreetName",
+}
+# 归入详细地址的实体类型
+_MGEO_TAGGING_ADDRESS_TYPES = frozenset({"road", "road_number", "poi", "house_number"})
+
+# mgeo 模型：实体类型 -> 地址字段
+_MGEO_FIELDS = {
+    ENTITY_TYPE_PROVINCE: "ProvinceName",
+    ENTITY_TYPE_CITY: "CityName",
+    ENTITY_TYPE_DISTRICT: "ExpAreaName",
+    ENTITY_TYPE_STREET: "StreetName",
+}
+# 归入详细地址的实体类型，Entity（POI一般名称）、Brand（著名品牌）、POI（兴趣点）也归入详细地址，
+# 这样可以保留如"绥棱林业局有限公司"这类机构名称信息
+_MGEO_ADDRESS_TYPES = frozenset({
+    ENTITY_TYPE_ROAD, ENTITY_TYPE_UNIT_ADDRESS, ENTITY_TYPE_NUMBER_ENG,
+    "Entity", "Brand", "POI"
+})
+
 
 def convert_mgeo_tagging_to_qwen_flash_format(mgeo_result: Dict[str, Any], original_text: str = "") -> Dict[str, Any]:
     """
@@ -36,89 +103,9 @@ def convert_mgeo_tagging_to_qwen_flash_format(mgeo_result: Dict[str, Any], origi
     Returns:
         qwen-flash 格式的结果
     """
-    # 检查是否是已包装的格式（包含 EBusinessID 和 Data）
-    if "EBusinessID" in mgeo_result and "Data" in mgeo_result:
-        # 从 Data 中提取 entities 和 text
-        data = mgeo_result.get("Data", {})
-        entities_data = data.get("entities", {})
-        text = data.get("text", original_text)
-        ebusiness_id = mgeo_result.get("EBusinessID", "1279441")
-        success = mgeo_result.get("Success", True)
-        reason = mgeo_result.get("Reason", "解析成功")
-        result_code = mgeo_result.get("ResultCode", "100")
-    else:
-        # 直接格式，从根级别提取
-        entities_data = mgeo_result.get("entities", {})
-        text = mgeo_result.get("text", original_text)
-        ebusiness_id = "1279441"
-        success = True
-        reason = "解析成功"
-        result_code = "100"
-    
-    # 初始化结果
-    result = _create_default_result(ebusiness_id, success, reason, result_code)
-    
-    # 检查是否有错误
-    if "error" in mgeo_result or not success:
-        result["Success"] = False
-        result["Reason"] = mgeo_result.get("error", reason if not success else DEFAULT_ERROR_REASON)
-        result["ResultCode"] = DEFAULT_ERROR_CODE
-        return result
-    
-    # 获取实体列表
-    entities = entities_data.get("output", [])
-    
-    if not entities:
-        return result
-    
-    # 按实体类型分类
-    province = ""
-    city = ""
-    district = ""
-    street = ""
-    address_entities = []
-    other_entities = []
-    
-    # 按 start 位置排序，确保顺序正确
-    sorted_entities = sorted(entities, key=lambda x: x.get("start", 0))
-    
-    for entity in sorted_entities:
-        entity_type = entity.get("type", "")
-        span = entity.get("span", "")
-        
-        # 新模型的实体类型映射
-        if entity_type == "prov":
-            province = span
-        elif entity_type == "city":
-            city = span
-        elif entity_type == "district":
-            district = span
-        elif entity_type == "town":
-            street = span
-        elif entity_type in ["road", "road_number", "poi", "house_number"]:
-            # 这些类型都归入详细地址
-            address_entities.append(entity)
-        elif entity_type == "other":
-            other_entities.append(span)
-    
-    # 填充地址信息
-    result["Data"]["ProvinceName"] = province
-    result["Data"]["CityName"] = city
-    result["Data"]["ExpAreaName"] = district
-    result["Data"]["StreetName"] = street
-    
-    # 按位置顺序组合详细地址
-    if address_entities:
-        address_entities_sorted = sorted(address_entities, key=lambda x: x.get("start", 0))
-        address_parts = [entity.get("span", "") for entity in address_entities_sorted]
-        result["Data"]["Address"] = "".join(address_parts)
-    
-    # 从原始文本中提取电话和姓名
-    _extract_phone_and_name_from_mgeo(
-        result, other_entities, sorted_entities, original_text or text
+    return _convert_mgeo(
+        mgeo_result, original_text, _MGEO_TAGGING_FIELDS, _MGEO_TAGGING_ADDRESS_TYPES, "other"
     )
-    
-    return result
 
 
 def convert_mgeo_to_qwen_flash_format(mgeo_result: Dict[str, Any], original_text: str = "") -> Dict[str, Any]:
@@ -178,91 +165,7 @@ def convert_mgeo_to_qwen_flash_format(mgeo_result: Dict[str, Any], original_text
             "ResultCode": "100"
         }
     """
-    # 检查是否是已包装的格式（包含 EBusinessID 和 Data）
-    if "EBusinessID" in mgeo_result and "Data" in mgeo_result:
-        # 从 Data 中提取 entities 和 text
-        data = mgeo_result.get("Data", {})
-        entities_data = data.get("entities", {})
-        text = data.get("text", original_text)
-        ebusiness_id = mgeo_result.get("EBusinessID", "1279441")
-        success = mgeo_result.get("Success", True)
-        reason = mgeo_result.get("Reason", "解析成功")
-        result_code = mgeo_result.get("ResultCode", "100")
-    else:
-        # 直接格式，从根级别提取
-        entities_data = mgeo_result.get("entities", {})
-        text = mgeo_result.get("text", original_text)
-        ebusiness_id = "1279441"
-        success = True
-        reason = "解析成功"
-        result_code = "100"
-    
-    # 初始化结果
-    result = _create_default_result(ebusiness_id, success, reason, result_code)
-    
-    # 检查是否有错误
-    if "error" in mgeo_result or not success:
-        result["Success"] = False
-        result["Reason"] = mgeo_result.get("error", reason if not success else DEFAULT_ERROR_REASON)
-        result["ResultCode"] = DEFAULT_ERROR_CODE
-        return result
-    
-    # 获取实体列表
-    entities = entities_data.get("output", [])
-    
-    if not entities:
-        return result
-    
-    # 按实体类型分类
-    province = ""
-    city = ""
-    district = ""
-    street = ""
-    address_entities = []
-    other_entities = []
-    
-    # 按 start 位置排序，确保顺序正确
-    sorted_entities = sorted(entities, key=lambda x: x.get("start", 0))
-    
-    for entity in sorted_entities:
-        entity_type = entity.get("type", "")
-        span = entity.get("span", "")
-        
-        if entity_type == ENTITY_TYPE_PROVINCE:
-            province = span
-        elif entity_type == ENTITY_TYPE_CITY:
-            city = span
-        elif entity_type == ENTITY_TYPE_DISTRICT:
-            district = span
-        elif entity_type == ENTITY_TYPE_STREET:
-            street = span
-        elif entity_type in [ENTITY_TYPE_ROAD, ENTITY_TYPE_UNIT_ADDRESS, ENTITY_TYPE_NUMBER_ENG]:
-            address_entities.append(entity)
-        elif entity_type in ["Entity", "Brand", "POI"]:
-            # 将Entity（POI一般名称）、Brand（著名品牌）、POI（兴趣点）也归入详细地址
-            # 这样可以保留如"绥棱林业局有限公司"这类机构名称信息
-            address_entities.append(entity)
-        elif entity_type == ENTITY_TYPE_OTHER:
-            other_entities.append(span)
-    
-    # 填充地址信息
-    result["Data"]["ProvinceName"] = province
-    result["Data"]["CityName"] = city
-    result["Data"]["ExpAreaName"] = district
-    result["Data"]["StreetName"] = street
-    
-    # 按位置顺序组合详细地址
-    if address_entities:
-        address_entities_sorted = sorted(address_entities, key=lambda x: x.get("start", 0))
-        address_parts = [entity.get("span", "") for entity in address_entities_sorted]
-        result["Data"]["Address"] = "".join(address_parts)
-    
-    # 从原始文本中提取电话和姓名
-    _extract_phone_and_name_from_mgeo(
-        result, other_entities, sorted_entities, original_text or text
-    )
-    
-    return result
+    return _convert_mgeo(mgeo_result, original_text, _MGEO_FIELDS, _MGEO_ADDRESS_TYPES, ENTITY_TYPE_OTHER)
 
 
 def parse_chinese_address(address_text: str) -> Dict[str, str]:
@@ -399,6 +302,101 @@ def convert_ner_to_address_format(
     return result
 
 
+def _convert_mgeo(
+    mgeo_result: Dict[str, Any],
+    original_text: str,
+    field_map: Dict[str, str],
+    address_types: frozenset,
+    other_type: str
+) -> Dict[str, Any]:
+    """
+    两个mgeo模型共用的转换流程，只有实体类型名称不同
+    
+    Args:
+        mgeo_result: mgeo 模型的返回结果（直接返回或已包装的格式）
+        original_text: 原始输入文本（用于提取电话和姓名）
+        field_map: 实体类型 -> 省市区街道字段
+        address_types: 归入详细地址的实体类型
+        other_type: 用于提取电话和姓名的其他信息实体类型
+    
+    Returns:
+        qwen-flash 格式的结果
+    """
+    # 拆出实体数据和文本，并按响应头字段初始化结果
+    entities_data, text, result = _unpack_mgeo_result(mgeo_result, original_text)
+    
+    # 检查是否有错误
+    success = result["Success"]
+    if "error" in mgeo_result or not success:
+        result["Success"] = False
+        result["Reason"] = mgeo_result.get("error", result["Reason"] if not success else DEFAULT_ERROR_REASON)
+        result["ResultCode"] = DEFAULT_ERROR_CODE
+        return result
+    
+    # 获取实体列表，没有实体（或字段为None）时直接返回默认结果，不再排序
+    entities = entities_data.get("output") if entities_data else None
+    if not entities:
+        return result
+    
+    # 按实体类型分类，省市区街道直接填入结果（同类型有多个时取最后一个），
+    # 详细地址的各部分按位置顺序收集，遍历结束后拼接
+    result_data = result["Data"]
+    address_parts = []
+    other_entities = []
+    
+    # 按 start 位置排序，确保顺序正确
+    sorted_entities = _sort_by_start(entities)
+    
+    for entity in sorted_entities:
+        entity_type = entity.get("type", "")
+        field = field_map.get(entity_type)
+        if field is not None:
+            result_data[field] = entity.get("span", "")
+        elif entity_type in address_types:
+            address_parts.append(entity.get("span", ""))
+        elif entity_type == other_type:
+            other_entities.append(entity.get("span", ""))
+    
+    if address_parts:
+        result_data["Address"] = "".join(address_parts)
+    
+    # 从原始文本中提取电话和姓名
+    _extract_phone_and_name_from_mgeo(
+        result, other_entities, sorted_entities, original_text or text
+    )
+    
+    return result
+
+
+def _unpack_mgeo_result(mgeo_result: Dict[str, Any], original_text: str) -> tuple:
+    """
+    拆分mgeo模型的返回结果（兼容直接返回和已包装两种格式）
+    
+    Returns:
+        (实体数据, 文本, 按响应头字段初始化的默认结果)
+    """
+    data = mgeo_result.get("Data")
+    # 已包装的格式（包含 EBusinessID 和 Data），从 Data 中提取 entities 和 text
+    if data is not None and "EBusinessID" in mgeo_result:
+        get = mgeo_result.get
+        result = _create_default_result(
+            get("EBusinessID", DEFAULT_EBUSINESS_ID), get("Success", True),
+            get("Reason", DEFAULT_SUCCESS_REASON), get("ResultCode", DEFAULT_SUCCESS_CODE)
+        )
+        return data.get("entities", {}), data.get("text", original_text), result
+    
+    # 直接格式，从根级别提取
+    return mgeo_result.get("entities", {}), mgeo_result.get("text", original_text), _create_default_result()
+
+
+def _sort_by_start(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按 start 位置排序实体，个别实体缺少 start 时按0处理"""
+    try:
+        return sorted(entities, key=_start_key)
+    except KeyError:
+        return sorted(entities, key=lambda x: x.get("start", 0))
+
+
 def _create_default_result(
     ebusiness_id: str = DEFAULT_EBUSINESS_ID,
     success: bool = True,
@@ -408,15 +406,8 @@ def _create_default_result(
     """创建默认格式的结果字典"""
     return {
         "EBusinessID": ebusiness_id,
-        "Data": {
-            "ProvinceName": "",
-            "StreetName": "",
-            "Address": "",
-            "CityName": "",
-            "ExpAreaName": "",
-            "Mobile": "",
-            "Name": ""
-        },
+        # 字段值都是不可变的字符串，浅复制即可得到独立的Data字典
+        "Data": _DEFAULT_DATA_TEMPLATE.copy(),
         "Success": success,
         "Reason": reason,
         "ResultCode": result_code
@@ -430,48 +421,27 @@ def _fill_address_from_classified_entities(
     mapping_config: Dict[str, Any]
 ) -> None:
     """从分类后的实体中填充地址信息"""
-    # 填充地址信息（取第一个匹配的实体）
-    if classified["province"]:
-        classified["province"].sort(key=lambda x: x.get("start", 0))
-        result["Data"]["ProvinceName"] = classified["province"][0].get("span", "")
-    
-    if classified["city"]:
-        classified["city"].sort(key=lambda x: x.get("start", 0))
-        result["Data"]["CityName"] = classified["city"][0].get("span", "")
-    
-    if classified["district"]:
-        classified["district"].sort(key=lambda x: x.get("start", 0))
-        result["Data"]["ExpAreaName"] = classified["district"][0].get("span", "")
-    
-    if classified["street"]:
-        classified["street"].sort(key=lambda x: x.get("start", 0))
-        result["Data"]["StreetName"] = classified["street"][0].get("span", "")
+    # 填充地址信息（取位置最靠前的实体），标准化后的实体都带有start字段
+    result_data = result["Data"]
+    for category, field in _CLASSIFIED_FIELDS:
+        entities = classified[category]
+        if entities:
+            result_data[field] = min(entities, key=_start_key).get("span", "")
     
     # 组合详细地址（按位置排序）
     if classified["address"]:
-        classified["address"].sort(key=lambda x: x.get("start", 0))
-        address_parts = [entity.get("span", "") for entity in classified["address"]]
-        result["Data"]["Address"] = "".join(address_parts)
-    
-    # 如果某些字段仍然为空，尝试从地理位置实体中解析
-    if not result["Data"]["ProvinceName"] or not result["Data"]["CityName"]:
-        for entity in entity_list:
-            entity_type = entity.get("type", "")
-            span = entity.get("span", "")
-            entity_types = mapping_config.get("ProvinceName", {}).get("entity_types", [])
-            if entity_type in entity_types:
-                parsed = AddressParser.parse_chinese_address(span)
-                if parsed["province"] and not result["Data"]["ProvinceName"]:
-                    result["Data"]["ProvinceName"] = parsed["province"]
-                if parsed["city"] and not result["Data"]["CityName"]:
-                    result["Data"]["CityName"] = parsed["city"]
-                if parsed["district"] and not result["Data"]["ExpAreaName"]:
-                    result["Data"]["ExpAreaName"] = parsed["district"]
-                if parsed["street"] and not result["Data"]["StreetName"]:
-                    result["Data"]["StreetName"] = parsed["street"]
-                if parsed["address"] and not result["Data"]["Address"]:
-                    result["Data"]["Address"] = parsed["address"]
-                break
+        address_entities = sorted(classified["address"], key=_start_key)
+        result_data["Address"] = "".join([entity.get("span", "") for entity in address_entities])
+    
+    # 如果某些字段仍然为空，用第一个地理位置实体的解析结果补充空字段
+    if not result_data["ProvinceName"] or not result_data["CityName"]:
+        location_types = frozenset(mapping_config.get("ProvinceName", {}).get("entity_types", []))
+        entity = next((entity for entity in entity_list if entity.get("type", "") in location_types), None)
+        if entity is not None:
+            parsed = AddressParser.parse_chinese_address(entity.get("span", ""))
+            for key, field in _PARSED_FIELDS:
+                if parsed[key] and not result_data[field]:
+                    result_data[field] = parsed[key]
 
 
 def _extract_phone_and_name_from_mgeo(
@@ -481,38 +451,30 @@ def _extract_phone_and_name_from_mgeo(
     text: str
 ) -> None:
     """从MGeo模型的other_entities中提取电话和姓名"""
-    import re
-    from src.config.constants import PHONE_PATTERN, CHINESE_NAME_PATTERN, ADDRESS_KEYWORDS
-    
+    result_data = result["Data"]
     # 首先尝试从 other_entities 中识别
     for entity_text in other_entities:
-        if re.match(PHONE_PATTERN, entity_text):
-            result["Data"]["Mobile"] = entity_text
-        elif re.match(CHINESE_NAME_PATTERN, entity_text):
-            result["Data"]["Name"] = entity_text
+        if _PHONE_RE.match(entity_text):
+            result_data["Mobile"] = entity_text
+        elif _NAME_RE.match(entity_text):
+            result_data["Name"] = entity_text
     
     # 如果从 other_entities 中没有找到，尝试从原始文本中提取
-    if not result["Data"]["Mobile"]:
+    if not result_data["Mobile"]:
         phone = EntityExtractor.extract_phone_from_text(text)
         if phone:
-            result["Data"]["Mobile"] = phone
+            result_data["Mobile"] = phone
     
-    if not result["Data"]["Name"]:
+    if not result_data["Name"]:
         # 找到所有地址实体的位置范围
-        address_ranges = []
-        for entity in sorted_entities:
-            entity_type = entity.get("type", "")
-            if entity_type in [
-                ENTITY_TYPE_PROVINCE, ENTITY_TYPE_CITY, ENTITY_TYPE_DISTRICT,
-                ENTITY_TYPE_STREET, ENTITY_TYPE_ROAD, ENTITY_TYPE_UNIT_ADDRESS,
-                ENTITY_TYPE_NUMBER_ENG
-            ]:
-                start = entity.get("start", 0)
-                end = entity.get("end", 0)
-                address_ranges.append((start, end))
+        address_ranges = [
+            (entity.get("start", 0), entity.get("end", 0))
+            for entity in sorted_entities
+            if entity.get("type", "") in _ADDRESS_ENTITY_TYPES
+        ]
         
         # 在非地址部分查找姓名
         name = AddressParser.find_name_in_non_address_text(text, address_ranges)
         if name:
-            result["Data"]["Name"] = name
+            result_data["Name"] = name
 
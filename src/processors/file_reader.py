@@ -3,7 +3,6 @@
 支持TXT、MD、WORD、PDF格式的文件读取
 """
 import os
-from pathlib import Path
 from typing import Optional
 import docx
 import PyPDF2
@@ -64,6 +63,23 @@ class FileReader:
             except Exception as e2:
                 raise Exception(f"读取PDF文件失败: {str(e2)}")
     
+    # 扩展名到读取方法名的映射
+    _READERS = {
+        '.txt': 'read_txt',
+        '.md': 'read_md',
+        '.docx': 'read_word',
+        '.doc': 'read_word',
+        '.pdf': 'read_pdf',
+    }
+    
+    @classmethod
+    def _read_by_extension(cls, file_path: str, extension: str) -> Optional[str]:
+        """按已计算好的扩展名调用对应的读取方法"""
+        reader_name = cls._READERS.get(extension)
+        if reader_name is None:
+            return None
+        return getattr(cls, reader_name)(file_path)
+    
     @classmethod
     def read_file(cls, file_path: str) -> Optional[str]:
         """
@@ -75,26 +91,17 @@ class FileReader:
         Returns:
             文件内容字符串，如果文件格式不支持则返回None
         """
-        file_path = Path(file_path)
+        file_path = str(file_path)
         
-        if not file_path.exists():
+        if not os.path.exists(file_path):
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
-        extension = file_path.suffix.lower()
+        extension = os.path.splitext(file_path)[1].lower()
         
         if extension not in cls.SUPPORTED_EXTENSIONS:
-            raise ValueError(f"不支持的文件格式: {extension}。支持的格式: {cls.SUPPORTED_EXTENSIONS}")
+            raise ValueError(f"不支持的文件格式: {extension}。支持的格式: {', '.join(sorted(cls.SUPPORTED_EXTENSIONS))}")
         
-        if extension == '.txt':
-            return cls.read_txt(str(file_path))
-        elif extension == '.md':
-            return cls.read_md(str(file_path))
-        elif extension in ['.docx', '.doc']:
-            return cls.read_word(str(file_path))
-        elif extension == '.pdf':
-            return cls.read_pdf(str(file_path))
-        else:
-            return None
+        return cls._read_by_extension(file_path, extension)
     
     @classmethod
     def read_all_files_in_dir(cls, dir_path: str) -> dict:
@@ -107,19 +114,20 @@ class FileReader:
         Returns:
             字典，key为文件名，value为文件内容
         """
-        dir_path = Path(dir_path)
-        if not dir_path.exists():
+        if not os.path.isdir(dir_path):
             raise FileNotFoundError(f"目录不存在: {dir_path}")
         
         files_content = {}
-        for file_path in dir_path.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in cls.SUPPORTED_EXTENSIONS:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                # 扩展名只计算一次，已确认存在的文件不再重复检查
+                extension = os.path.splitext(entry.name)[1].lower()
+                if extension not in cls.SUPPORTED_EXTENSIONS or not entry.is_file():
+                    continue
                 try:
-                    content = cls.read_file(str(file_path))
-                    files_content[file_path.name] = content
+                    files_content[entry.name] = cls._read_by_extension(entry.path, extension)
                 except Exception as e:
-                    print(f"读取文件 {file_path.name} 时出错: {str(e)}")
+                    print(f"读取文件 {entry.name} 时出错: {str(e)}")
                     continue
         
         return files_content
-
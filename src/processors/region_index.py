@@ -0,0 +1,178 @@
+"""
+区域表内存索引
+将区域表一次性加载到内存中，地址补全时的查询不再访问数据库
+"""
+import sys
+from array import array
+from collections import namedtuple
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def intern_name(name: Any) -> Any:
+    """驻留区域名称字符串，相同名称共用同一个对象，比较时可直接按对象身份判等"""
+    return sys.intern(name) if type(name) is str else name
+
+
+# 区域记录，字段与区域表的查询字段一致；比逐行保存字典占用的内存少，按属性访问也更快
+Region = namedtuple('Region', ['id', 'parent_id', 'region_name', 'region_type', 'alias_name'])
+
+
+def region_from_row(row: Optional[Dict[str, Any]]) -> Optional[Region]:
+    """把数据库查询得到的字典转换为 Region，并驻留其中的名称字符串，row为空时返回None"""
+    if not row:
+        return None
+    return Region(
+        row['id'],
+        row.get('parent_id'),
+        intern_name(row.get('region_name')),
+        row.get('region_type'),
+        intern_name(row.get('alias_name'))
+    )
+
+
+class RegionIndex:
+    """
+    区域表的只读内存快照，提供与 AddressCompleter 数据库查询一致的查找方法
+
+    按列存储（id、parent_id、region_type 存放在整数数组中，名称和别名存放在列表中），
+    各索引只保存行号，查找结果在返回时才组装成 Region，比逐行保存字典占用的内存少得多；
+    父级关系预先解析为父级行号数组，查找父级链时只需沿数组逐级跳转，无需哈希查找
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]],
+                 parent_types: Optional[Dict[int, Optional[int]]] = None):
+        """
+        构建索引
+
+        Args:
+            rows: 区域记录（包含id, parent_id, region_name, region_type, alias_name），
+                  同名同类型的区域有多条时取id最小的一条
+            parent_types: 区域类型 -> 父级区域类型，查找父级链时上一级区域的类型必须与之一致
+                          （与逐级查询 find_parent_by_type_and_id 相同），未配置的类型不限制
+        """
+        self._parent_types = parent_types or {}
+        rows = sorted(rows, key=itemgetter('id'))
+        self._ids = array('q', (row['id'] for row in rows))
+        self._parent_ids = array('q', (row.get('parent_id') or 0 for row in rows))
+        # 区域类型和行号都远小于2^31，用4字节整数存放
+        self._types = array('i', (row.get('region_type') or 0 for row in rows))
+        # 名称大量重复（如各地的“城关镇”），驻留后相同名称只保存一份
+        self._names: List[Any] = [intern_name(row.get('region_name')) for row in rows]
+        self._aliases: List[Any] = [intern_name(row.get('alias_name')) for row in rows]
+        # 父级区域的行号，没有父级（或父级已删除）时为-1
+        self._parent_rows = array('i', (self._row_of_id(parent_id) for parent_id in self._parent_ids))
+
+        self._name_rows: Dict[Tuple[int, Any], int] = {}
+        self._plain_name_rows: Dict[Any, int] = {}
+        self._alias_rows: Dict[Tuple[int, Any], int] = {}
+        type_rows: Dict[int, List[int]] = {}
+        for i, (region_type, region_name, alias_name) in enumerate(zip(self._types, self._names, self._aliases)):
+            type_rows.setdefault(region_type, []).append(i)
+            if region_name:
+                self._name_rows.setdefault((region_type, region_name), i)
+                self._plain_name_rows.setdefault(region_name, i)
+            if alias_name:
+                self._alias_rows.setdefault((region_type, alias_name), i)
+        self._type_rows = {region_type: array('i', indexes) for region_type, indexes in type_rows.items()}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _row_of_id(self, region_id: Any) -> int:
+        """根据区域ID二分查找行号，不存在时返回-1"""
+        if not region_id:
+            return -1
+        i = bisect_left(self._ids, region_id)
+        return i if i < len(self._ids) and self._ids[i] == region_id else -1
+
+    def _region(self, i: int) -> Optional[Region]:
+        """把第i行组装为 Region"""
+        if i < 0:
+            return None
+        return Region(self._ids[i], self._parent_ids[i], self._names[i], self._types[i], self._aliases[i])
+
+    def find_by_name(self, region_name: str, region_type: Optional[int] = None) -> Optional[Region]:
+        """根据区域名称（和类型）查找区域"""
+        if region_type:
+            return self._region(self._name_rows.get((region_type, region_name), -1))
+        return self._region(self._plain_name_rows.get(region_name, -1))
+
+    def find_by_id(self, region_id: Any, region_type: Optional[int] = None) -> Optional[Region]:
+        """根据区域ID（和类型）查找区域"""
+        i = self._row_of_id(region_id)
+        if i >= 0 and region_type and self._types[i] != region_type:
+            return None
+        return self._region(i)
+
+    def _ancestors(self, i: int, max_levels: int) -> List[Region]:
+        """从第i行开始沿父级行号向上取出区域自身及其所有上级区域，上一级区域类型不符时到此为止"""
+        ancestors = []
+        while i >= 0 and len(ancestors) < max_levels:
+            ancestors.append(self._region(i))
+            parent = self._parent_rows[i]
+            expected_type = self._parent_types.get(self._types[i])
+            if parent >= 0 and expected_type and self._types[parent] != expected_type:
+                break
+            i = parent
+        return ancestors
+
+    def ancestors_by_id(self, region_id: Any, max_levels: int) -> List[Region]:
+        """
+        获取区域自身及其所有上级区域
+
+        Args:
+            region_id: 起始区域ID
+            max_levels: 最多包含的层级数
+
+        Returns:
+            按层级从低到高排列的区域信息列表，起始区域不存在时返回空列表
+        """
+        return self._ancestors(self._row_of_id(region_id), max_levels)
+
+    def ancestors_by_name(self, region_name: str, region_type: int, max_levels: int) -> List[Region]:
+        """根据区域名称和类型查找起始区域，返回格式与 ancestors_by_id 一致"""
+        return self._ancestors(self._name_rows.get((region_type, region_name), -1), max_levels)
+
+    def find_by_address(self, address_text: str, region_type: int) -> Optional[Region]:
+        """
+        在指定类型的区域中匹配Address文本，匹配顺序与数据库查询一致：
+        region_name 相等 > region_name 包含关系 > alias_name 相等 > alias_name 包含关系，
+        包含关系中优先“名称包含Address”，其次“Address包含名称”，同级取名称最长的一条
+
+        Args:
+            address_text: 已去除首尾空格的Address文本
+            region_type: 区域类型
+
+        Returns:
+            匹配到的区域信息，未匹配时返回None
+        """
+        i = self._name_rows.get((region_type, address_text), -1)
+        if i < 0:
+            candidates = self._type_rows.get(region_type, ())
+            i = self._find_containing(candidates, self._names, address_text)
+            if i < 0:
+                i = self._alias_rows.get((region_type, address_text), -1)
+                if i < 0:
+                    i = self._find_containing(candidates, self._aliases, address_text)
+        return self._region(i)
+
+    @staticmethod
+    def _find_containing(candidates: Iterable[int], column: List[Any], address_text: str) -> int:
+        """在候选行中查找指定列与Address文本存在包含关系、且最优先的一行，未找到时返回-1"""
+        best = -1
+        best_rank = None
+        for i in candidates:
+            name = column[i]
+            if not name or not isinstance(name, str):
+                continue
+            if address_text in name:
+                rank = (0, -len(name))
+            elif name in address_text:
+                rank = (1, -len(name))
+            else:
+                continue
+            if best_rank is None or rank < best_rank:
+                best, best_rank = i, rank
+        return best
@@ -98,7 +98,7 @@ class TextPreprocessor:
             
         except Exception as e:
             error_msg = f"预处理失败: {str(e)}"
-            logger.error(f"预处理错误: {error_msg}", exc_info=True)
+            logger.error("预处理错误: %s", error_msg, exc_info=True)
             return {
                 "original_text": text,
                 "corrected_text": text,
@@ -284,11 +284,11 @@ class TextPreprocessor:
                 corrected = response.output.text.strip()
                 return corrected
             else:
-                logger.warning(f"纠错失败: {response.message}")
+                logger.warning("纠错失败: %s", response.message)
                 return text
                 
         except Exception as e:
-            logger.error(f"文本纠错出错: {str(e)}", exc_info=True)
+            logger.error("文本纠错出错: %s", e, exc_info=True)
             return text
     
     def _complete_address(self, address_text: str) -> Dict[str, Any]:
@@ -350,10 +350,10 @@ class TextPreprocessor:
                         try:
                             address_info = json.loads(json_str)
                         except json.JSONDecodeError:
-                            logger.warning(f"JSON解析失败: {json_str}")
+                            logger.warning("JSON解析失败: %s", json_str)
                             return self._default_address_info()
                     else:
-                        logger.warning(f"未找到JSON格式: {result_text}")
+                        logger.warning("未找到JSON格式: %s", result_text)
                         return self._default_address_info()
                 
                 # 确保所有字段都存在，并转换为字符串
@@ -367,11 +367,11 @@ class TextPreprocessor:
                 
                 return result
             else:
-                logger.warning(f"地址补全失败: {response.message}")
+                logger.warning("地址补全失败: %s", response.message)
                 return self._default_address_info()
                 
         except Exception as e:
-            logger.error(f"地址补全出错: {str(e)}", exc_info=True)
+            logger.error("地址补全出错: %s", e, exc_info=True)
             return self._default_address_info()
     
     def _default_address_info(self) -> Dict[str, str]:
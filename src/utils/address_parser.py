@@ -8,6 +8,22 @@ from ..config.constants import (
     ADDRESS_KEYWORDS, DIRECT_CITIES, PROVINCE_PATTERN,
     CITY_PATTERN, DISTRICT_PATTERN, STREET_PATTERN
 )
+from .admin_trie import PrefixTrie
+
+# 直辖市名称前缀树：全称和"简称+市"都映射为作为省份返回的名称
+_DIRECT_CITY_TRIE = PrefixTrie(
+    (name, name)
+    for full_name, short_name in DIRECT_CITIES.items()
+    for name in (full_name, short_name + "市")
+)
+
+# 各层级的预编译正则表达式，按省、市、区县、街道的顺序依次匹配
+_PROVINCE_RE = re.compile(PROVINCE_PATTERN)
+_LEVEL_RES = (
+    ("city", re.compile(CITY_PATTERN)),
+    ("district", re.compile(DISTRICT_PATTERN)),
+    ("street", re.compile(STREET_PATTERN)),
+)
 
 
 class AddressParser:
@@ -47,41 +63,24 @@ class AddressParser:
         
         remaining_text = address_text.strip()
         
-        # 处理直辖市（北京、上海、天津、重庆）
-        for full_name, short_name in DIRECT_CITIES.items():
-            if remaining_text.startswith(full_name):
-                result["province"] = full_name
-                remaining_text = remaining_text[len(full_name):].strip()
-                break
-            elif remaining_text.startswith(short_name + "市"):
-                result["province"] = short_name + "市"
-                remaining_text = remaining_text[len(short_name + "市"):].strip()
-                break
-        
-        # 1. 匹配省份（如果还没有匹配到）
-        if not result["province"]:
-            province_match = re.match(PROVINCE_PATTERN, remaining_text)
+        # 处理直辖市（北京、上海、天津、重庆），按前缀树最长匹配
+        matched_len, direct_city = _DIRECT_CITY_TRIE.longest_prefix(remaining_text)
+        if matched_len:
+            result["province"] = direct_city
+            remaining_text = remaining_text[matched_len:].strip()
+        else:
+            # 1. 匹配省份
+            province_match = _PROVINCE_RE.match(remaining_text)
             if province_match:
                 result["province"] = province_match.group(1)
                 remaining_text = remaining_text[len(result["province"]):].strip()
         
-        # 2. 匹配城市
-        city_match = re.match(CITY_PATTERN, remaining_text)
-        if city_match:
-            result["city"] = city_match.group(1)
-            remaining_text = remaining_text[len(result["city"]):].strip()
-        
-        # 3. 匹配区县
-        district_match = re.match(DISTRICT_PATTERN, remaining_text)
-        if district_match:
-            result["district"] = district_match.group(1)
-            remaining_text = remaining_text[len(result["district"]):].strip()
-        
-        # 4. 匹配街道
-        street_match = re.match(STREET_PATTERN, remaining_text)
-        if street_match:
-            result["street"] = street_match.group(1)
-            remaining_text = remaining_text[len(result["street"]):].strip()
+        # 2. 匹配城市 3. 匹配区县 4. 匹配街道
+        for level, pattern in _LEVEL_RES:
+            match = pattern.match(remaining_text)
+            if match:
+                result[level] = match.group(1)
+                remaining_text = remaining_text[len(result[level]):].strip()
         
         # 5. 剩余部分作为详细地址
         if remaining_text:
@@ -0,0 +1,57 @@
+"""
+行政区划名称前缀树
+用于在地址文本开头按最长前缀匹配已知的行政区划名称
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 终止标记：字典中以空字符串为键保存名称对应的值（单个字符不可能为空字符串，不会与子节点冲突）
+_END = ''
+
+
+class PrefixTrie:
+    """
+    基于嵌套字典的前缀树
+
+    构建完成后只读，可在多个线程间共享；查找耗时只与匹配的文本长度有关，与名称数量无关
+    """
+
+    def __init__(self, names: Iterable[Tuple[str, Any]] = ()):
+        """
+        构建前缀树
+
+        Args:
+            names: (名称, 值) 列表，值在匹配成功时随匹配长度一起返回
+        """
+        self._root: Dict[str, Any] = {}
+        for name, value in names:
+            self.add(name, value)
+
+    def add(self, name: str, value: Any):
+        """插入一个名称（名称为空时忽略）"""
+        if not name:
+            return
+        node = self._root
+        for ch in name:
+            node = node.setdefault(ch, {})
+        node[_END] = value
+
+    def longest_prefix(self, text: str, pos: int = 0) -> Tuple[int, Optional[Any]]:
+        """
+        查找text从pos开始能匹配的最长名称
+
+        Args:
+            text: 待匹配的文本
+            pos: 起始位置
+
+        Returns:
+            (匹配长度, 名称对应的值)，未匹配时返回 (0, None)
+        """
+        node = self._root
+        matched_len, matched_value = 0, None
+        for i in range(pos, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if _END in node:
+                matched_len, matched_value = i - pos + 1, node[_END]
+        return matched_len, matched_value
@@ -0,0 +1,87 @@
+"""
+线程间的批量加载器
+将短时间窗口内多个线程发起的查询合并为一次批量查询（DataLoader 模式）
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class _PendingLoad:
+    """等待合并查询的一批键"""
+
+    __slots__ = ('keys', 'full', 'done', 'results', 'error')
+
+    def __init__(self):
+        # 用字典保持插入顺序并去重
+        self.keys: Dict[Hashable, None] = {}
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results: Dict[Hashable, Any] = {}
+        self.error: Optional[BaseException] = None
+
+
+class BatchLoader:
+    """
+    批量加载器
+
+    第一个请求的线程负责等待一个窗口期，窗口结束或攒满 max_batch_size 个键时，
+    调用 batch_fn 一次性查询所有键，再把结果分发给各个等待中的线程。
+    适用于在线程池中执行的阻塞查询（如数据库查询）。
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Dict[Hashable, Any]],
+                 max_batch_size: int = 128, max_wait: float = 0.005):
+        """
+        初始化批量加载器
+
+        Args:
+            batch_fn: 批量查询函数，参数为去重后的键列表，返回 {键: 结果} 字典
+            max_batch_size: 每批最多合并的键数
+            max_wait: 等待窗口（秒）
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Optional[_PendingLoad] = None
+        self._lock = threading.Lock()
+
+    def load(self, key: Hashable, default: Any = None) -> Any:
+        """
+        查询一个键，等待合并查询后返回该键的结果
+
+        Args:
+            key: 查询键
+            default: 批量查询结果中没有该键时的返回值
+
+        Returns:
+            该键的查询结果，批量查询抛出的异常会在每个等待线程中重新抛出
+        """
+        with self._lock:
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = _PendingLoad()
+                self._pending = batch
+            batch.keys[key] = None
+            if len(batch.keys) >= self.max_batch_size:
+                # 攒满后不再接收新的键，并提前结束等待窗口
+                self._pending = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.max_wait)
+            with self._lock:
+                if self._pending is batch:
+                    self._pending = None
+            try:
+                batch.results = self.batch_fn(list(batch.keys))
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results.get(key, default)
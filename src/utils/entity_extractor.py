@@ -12,6 +12,8 @@ from ..config.constants import (
 )
 from .address_parser import AddressParser
 
+_PHONE_RE = re.compile(PHONE_PATTERN)
+
 
 class EntityExtractor:
     """实体提取器，用于从NER结果中提取和分类实体"""
@@ -211,7 +213,10 @@ class EntityExtractor:
     @staticmethod
     def extract_phone_from_text(text: str) -> str:
         """从文本中提取手机号码"""
-        phone_match = re.search(PHONE_PATTERN, text)
+        # 手机号以数字1开头，文本中没有"1"时无需执行正则匹配
+        if '1' not in text:
+            return ""
+        phone_match = _PHONE_RE.search(text)
         return phone_match.group(0) if phone_match else ""
     
     @staticmethod
@@ -0,0 +1,117 @@
+"""
+线程安全的LRU缓存
+用于缓存模型推理结果等可重复使用的计算结果
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import orjson
+
+# 缓存未命中时的哨兵对象（缓存值本身可能为None）
+_MISSING = object()
+
+
+class LRUCache:
+    """线程安全的最近最少使用（LRU）缓存，支持可选的过期时间和命中统计"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大缓存条目数，小于等于0时不缓存
+            ttl: 缓存条目的过期时间（秒），为None或小于等于0时永不过期
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.hits = 0
+        self.misses = 0
+        # 值为 (缓存值, 过期时间)，过期时间为None表示永不过期
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值，命中时将其移动到最近使用位置，已过期的条目视为未命中并删除"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        写入缓存值，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 该条目的过期时间（秒），为None时使用缓存默认的过期时间
+        """
+        if self.maxsize <= 0:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """清空缓存和命中统计"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _digest(data: bytes) -> str:
+    """计算128位blake2b摘要"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def make_inference_cache_key(model_name: str, text: str, schema: Optional[dict] = None) -> Optional[tuple]:
+    """
+    生成推理结果缓存键
+
+    Args:
+        model_name: 模型名称
+        text: 输入文本
+        schema: 实体抽取schema（按键排序后序列化，保证相同内容得到相同的键）
+
+    Returns:
+        (模型名称, 文本摘要, schema摘要)；schema无法用orjson序列化（如超出64位的整数）时返回None，调用方不使用缓存
+    """
+    if schema:
+        try:
+            schema_digest = _digest(orjson.dumps(schema, option=orjson.OPT_SORT_KEYS))
+        except TypeError:
+            return None
+    else:
+        schema_digest = ''
+    return model_name, _digest(text.encode('utf-8')), schema_digest
@@ -0,0 +1,113 @@
+"""
+请求级微批处理
+将短时间窗口内到达的、使用相同模型和schema的单条抽取请求合并为一次批量推理
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+class _PendingBatch:
+    """等待合并推理的一批请求"""
+
+    __slots__ = ('model', 'schema', 'texts', 'futures', 'timer')
+
+    def __init__(self, model: Any, schema: Optional[Dict[str, Any]]):
+        self.model = model
+        self.schema = schema
+        self.texts: List[str] = []
+        self.futures: List[asyncio.Future] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """
+    微批处理器
+
+    第一条请求到达时开启一个等待窗口，窗口结束或攒满 max_batch_size 条请求时，
+    调用模型的 extract_entities_batch 一次性推理，再把结果分发给各个等待中的请求。
+    """
+
+    def __init__(self, run_batch: Callable[..., Awaitable[List[Any]]],
+                 max_batch_size: int = 16, max_wait: float = 0.01):
+        """
+        初始化微批处理器
+
+        Args:
+            run_batch: 执行批量推理的协程函数，调用方式为 run_batch(func, texts, schema)，
+                       用于把阻塞的推理放到线程池中执行
+            max_batch_size: 每批最多合并的请求数
+            max_wait: 等待窗口（秒）
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Dict[Hashable, _PendingBatch] = {}
+        # 正在执行的推理任务；事件循环只保存任务的弱引用，需要在这里持有，避免执行途中被垃圾回收
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, model: Any, text: str,
+                     schema: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        提交一条文本，等待合并推理后返回该文本的结果
+
+        Args:
+            key: 合并键，只有键相同（同一模型、同一schema）的请求才会合并
+            model: 已加载的模型实例，需要提供 extract_entities_batch 方法
+            text: 输入文本
+            schema: 实体抽取schema
+
+        Returns:
+            与 model.extract_entities(text, schema) 格式一致的抽取结果
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch(model, schema)
+            batch.timer = loop.call_later(self.max_wait, self._flush, key)
+            self._pending[key] = batch
+
+        future = loop.create_future()
+        batch.texts.append(text)
+        batch.futures.append(future)
+
+        if len(batch.texts) >= self.max_batch_size:
+            batch.timer.cancel()
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: Hashable):
+        """结束等待窗口，后台执行这一批的推理"""
+        batch = self._pending.pop(key, None)
+        if batch is not None:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _PendingBatch):
+        """
+        执行批量推理并把结果分发给各个请求
+
+        推理被取消（如关闭服务时取消线程池中的任务）或返回的结果数量与文本数量不一致时，
+        每个等待中的请求都会收到异常，不会一直挂起
+        """
+        try:
+            results = await self.run_batch(batch.model.extract_entities_batch, batch.texts, batch.schema)
+            if len(results) != len(batch.futures):
+                raise RuntimeError(
+                    f"批量推理返回的结果数量({len(results)})与文本数量({len(batch.futures)})不一致"
+                )
+        except BaseException as e:
+            # 取消等不属于Exception的异常转换为普通异常交给等待的请求，取消本身继续向上传递
+            error = e if isinstance(e, Exception) else RuntimeError(f"批量推理未完成: {type(e).__name__}")
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(error)
+            if error is not e:
+                raise
+            return
+
+        for future, result in zip(batch.futures, results):
+            # 请求已取消（如客户端断开）时跳过
+            if not future.done():
+                future.set_result(result)
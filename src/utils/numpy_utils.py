@@ -0,0 +1,21 @@
+"""
+numpy类型转换
+模型输出中的numpy标量和数组转换为Python原生类型，便于JSON/Pydantic序列化
+"""
+import numpy as np
+
+
+def convert_numpy_types(obj):
+    """递归转换numpy类型为Python原生类型（解决Pydantic序列化问题）"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {key: convert_numpy_types(value) for key, value in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [convert_numpy_types(item) for item in obj]
+    else:
+        return obj
@@ -0,0 +1,28 @@
+"""
+响应时间戳
+同一时间窗口内的请求共用同一个已格式化的时间戳字符串，不必每个请求都读取系统时间并格式化
+"""
+import time
+from datetime import datetime
+
+# 时间戳缓存的粒度（秒），返回的时间戳最多滞后这么久
+TIMESTAMP_GRANULARITY = 0.1
+
+# (单调时钟读数, 时间戳字符串)；整体替换元组，多线程读写时不会读到不一致的两部分
+_cached = (float('-inf'), '')
+
+
+def now_iso() -> str:
+    """
+    获取当前本地时间的ISO格式字符串，格式与 datetime.now().isoformat() 一致
+
+    距上次格式化不足 TIMESTAMP_GRANULARITY 秒时直接返回缓存的字符串；
+    按需刷新而不是由后台任务定时刷新，服务空闲时不会产生任何开销
+    """
+    global _cached
+    tick, text = _cached
+    now = time.monotonic()
+    if now - tick >= TIMESTAMP_GRANULARITY:
+        text = datetime.now().isoformat()
+        _cached = (now, text)
+    return text
@@ -2,19 +2,16 @@
 Windows启动脚本
 启动FastAPI API服务
 """
-import sys
 import os
 from pathlib import Path
 
 # 获取项目根目录
-project_root = Path(__file__).parent
+project_root = Path(__file__).resolve().parent
 
-# 切换到项目根目录
+# 切换到项目根目录（热重载模式下监听项目目录的文件变化）
+# 直接运行本脚本时项目根目录已位于sys.path首位，无需再手动添加
 os.chdir(project_root)
 
-# 添加项目根目录到Python路径
-sys.path.insert(0, str(project_root))
-
 # 启动FastAPI服务
 if __name__ == "__main__":
     import uvicorn
@@ -30,6 +27,13 @@ if __name__ == "__main__":
     print("=" * 60)
     
     # 启动FastAPI服务
-    # 使用 reload=True 支持热重载（开发模式）
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
+    # 生产模式按CPU核数启动多个worker；设置 DEV=1 时使用单进程热重载（开发模式）
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv('WEB_CONCURRENCY', '1')),
+        reload=os.getenv('DEV') == '1',
+        access_log=False
+    )
 
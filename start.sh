@@ -23,6 +23,11 @@ echo "按 Ctrl+C 停止服务"
 echo "============================================================"
 
 # 启动FastAPI服务
-# 使用 reload=True 支持热重载（开发模式）
-python3 -m uvicorn app:app --host 0.0.0.0 --port 8000 --reload
+# 生产模式按CPU核数启动多个worker；设置 DEV=1 时使用单进程热重载（开发模式）
+if [ "$DEV" = "1" ]; then
+    python3 -m uvicorn app:app --host 0.0.0.0 --port 8000 --reload
+else
+    python3 -m uvicorn app:app --host 0.0.0.0 --port 8000 \
+        --workers "${WEB_CONCURRENCY:-1}" --no-access-log
+fi
 